@@ -1,45 +1,312 @@
-import random
-import plotly.express as px
-from collections import Counter
-from student import Student
+import hashlib
+import importlib
+import os
+import secrets
+import sys
+import threading
+from typing import TYPE_CHECKING
 import polars as pl
+from grade_parser import GradeParser
+from instrumentation import StageTimings
+
+# Plotly takes longer to import than everything else here, so it is only imported once a figure is made
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+# Histograms show one bar per distinct grade up to this many distinct grades, and equal-width bins beyond it
+MAX_DISTINCT_GRADE_BARS = 30
+HISTOGRAM_BINS = 20
+
+# A grade is flagged if it is this many standard deviations from its assignment's mean,
+# or this many times the student's median percentage
+ANOMALY_Z_SCORE = 5.0
+ANOMALY_STUDENT_RATIO = 10.0
+
+# Correlations between two assignments need at least this many students graded on both
+MIN_CORRELATION_STUDENTS = 3
+
+# Variances this small relative to the sum of squares are rounding residue of constant grades, not real spread
+ZERO_VARIANCE_TOLERANCE = 1e-12
+
+# The memory of a kind of figure is estimated from this many of them, since figures of one course are alike in size
+FIGURE_SIZE_SAMPLES = 5
+
+# Pseudonyms are keyed hashes of the student IDs. Set the key to keep them the same after a restart
+ANONYMIZATION_KEY_VARIABLE = "CANVAS_ANALYZER_ANONYMIZATION_KEY"
+ANONYMIZATION_KEY = hashlib.blake2b(os.environ[ANONYMIZATION_KEY_VARIABLE].encode()).digest() if os.environ.get(ANONYMIZATION_KEY_VARIABLE) else secrets.token_bytes(32)
+PSEUDONYM_LENGTH = 6
+
+def get_statistics_expressions(column: str) -> list[pl.Expr]:
+    """
+    Returns the aggregations behind every basic statistics table, for use in a group_by
+
+    Parameters:
+        column (str): The column holding the grades
+
+    Returns:
+        list[pl.Expr]: The mean, median, standard deviation, minimum, maximum, quartiles, count and number missing
+    """
+
+    grade = pl.col(column)
+
+    return [
+        grade.mean().alias("Mean"),
+        grade.median().alias("Median"),
+        grade.std().alias("Standard Deviation"),
+        grade.min().alias("Minimum"),
+        grade.max().alias("Maximum"),
+        grade.quantile(0.25).alias("25th Percentile"),
+        grade.quantile(0.50).alias("50th Percentile"),
+        grade.quantile(0.75).alias("75th Percentile"),
+        grade.count().alias("Count"),
+        grade.null_count().alias("Missing")
+    ]
+
+def warm_up() -> None:
+    """
+    Imports Plotly and runs every analysis step once on a tiny made-up gradebook, so the first real
+    upload after the server starts does not pay for the imports and first-call setup
+
+    Parameters:
+        None
+
+    Returns:
+        None
+    """
+
+    grade_matrix = pl.DataFrame({
+        "ID": ["1", "2", "3"],
+        "First Name": ["A", "B", "C"],
+        "Last Name": ["X", "Y", "Z"],
+        "Name": ["A X", "B Y", "C Z"],
+        "Section": ["1", "1", "2"],
+        "Assignment": [1.0, None, 3.0]
+    })
+
+    # Not lazy, so the rankings, statistics, distributions and figures are all made
+    analyzer = Analyzer(grade_matrix, ["Assignment"], [3.0])
+    analyzer.get_student_averages()
+    analyzer.get_section_means()
+
+def import_plotly():
+    """
+    Imports Plotly for making a figure, along with pandas if it is installed. Plotly only looks pandas up in
+    sys.modules when checking the figure data, so a figure made in the background while another thread is
+    still importing pandas would find it half initialized. Importing it here waits for that import instead.
+
+    Parameters:
+        None
+
+    Returns:
+        module: The plotly.graph_objects module
+    """
+
+    import plotly.graph_objects as go
+
+    try:
+        importlib.import_module("pandas")
+    except ImportError:
+        pass
+
+    return go
+
+def estimate_object_size(value, seen: set | None = None) -> int:
+    """
+    Estimates the memory held by a Python object and everything it contains (e.g. a figure's JSON-like data).
+    Arrays count their buffers, and objects reachable more than once are only counted once.
+
+    Parameters:
+        value: The object
+        seen (set | None): The IDs of the objects already counted
+
+    Returns:
+        int: The estimated size in bytes
+    """
+
+    if seen is None:
+        seen = set()
+
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    # NumPy arrays (and anything else with a buffer) report their data size
+    if hasattr(value, "nbytes"):
+        return value.nbytes
+
+    size = sys.getsizeof(value)
+
+    if isinstance(value, dict):
+        size += sum(estimate_object_size(key, seen) + estimate_object_size(item, seen) for key, item in value.items())
+    elif isinstance(value, (list, tuple, set)):
+        size += sum(estimate_object_size(item, seen) for item in value)
+
+    return size
+
+class AssignmentCache(dict):
+    def __init__(self, assignments: list[str], factory) -> None:
+        """
+        Initializes a per-assignment cache that computes missing entries on first access
+
+        Parameters:
+            assignments (list[str]): The assignment titles the cache may hold
+            factory: Callable that builds the entry for a single assignment
+
+        Returns:
+            None
+        """
+
+        super().__init__()
+        self.assignments = assignments
+        self.factory = factory
+
+        # The background precompute and the UI may ask for the same entry at the same time
+        self.lock = threading.Lock()
+        self.key_locks = {}
+
+    def __missing__(self, assignment: str):
+        """
+        Builds, memoizes and returns the entry for an assignment that has not been computed yet.
+        Threads asking for the same entry at the same time wait for a single build instead of repeating it.
+
+        Parameters:
+            assignment (str): The assignment title
+
+        Returns:
+            The entry for the assignment
+        """
+
+        if assignment not in self.assignments:
+            raise KeyError(assignment)
+
+        with self.lock:
+            key_lock = self.key_locks.setdefault(assignment, threading.RLock())
+
+        with key_lock:
+            # Another thread may have built the entry while this one waited
+            if dict.__contains__(self, assignment):
+                return dict.__getitem__(self, assignment)
+
+            # The factory may have filled the entry itself (e.g. rank_assignment stores its rankings)
+            value = self.factory(assignment)
+            if not dict.__contains__(self, assignment):
+                self[assignment] = value
+
+            return dict.__getitem__(self, assignment)
+
+    def copy(self) -> "AssignmentCache":
+        """
+        Returns a shallow copy that still computes missing entries through this cache,
+        so anything computed from the copy is memoized here as well
+
+        Parameters:
+            None
+
+        Returns:
+            AssignmentCache: The copy of the cache
+        """
+
+        new_cache = AssignmentCache(self.assignments, self.__getitem__)
+        new_cache.update(self)
+
+        return new_cache
 
 class Analyzer:
-    def __init__(self, student_data: list[Student], assignments: list[str], assignment_max_points: list[float]) -> None:
+    def __init__(self, grade_matrix: pl.DataFrame, assignments: list[str], assignment_max_points: list[float], lazy: bool = False, timings: StageTimings | None = None, status_matrix: pl.DataFrame | None = None) -> None:
         """
-        Initializes the analyzer with the student data
+        Initializes the analyzer with the grade matrix
 
         Parameters:
-            student_data (list[Student]): The list of student data
+            grade_matrix (pl.DataFrame): The grade matrix with ID, Name and Section columns and one Float64 column per assignment
             assignments (list[str]): The list of assignment titles
             assignment_max_points (list[float]): The list of assignment max points
+            lazy (bool): Whether to compute each assignment's analysis on first request instead of up front
+            timings (StageTimings | None): Where to record the time spent in each analysis stage
+            status_matrix (pl.DataFrame | None): The Canvas state of each grade that is not a number (EX, incomplete, etc.),
+            in the same row order as the grade matrix, or None if it is not known
 
         Returns:
             None
         """
 
-        self.student_data = student_data
+        self.grade_matrix = grade_matrix
+        self.status_matrix = status_matrix if status_matrix is not None else grade_matrix.select(
+            "ID", *[pl.lit(None, dtype=pl.Utf8).alias(assignment) for assignment in assignments]
+        )
         self.assignments = assignments
         self.assignment_max_points = assignment_max_points
-        self.assignment_rankings = {}
-        self.box_plots = {}
-        self.histograms = {}
-        self.grade_distributions = {}
-        self.basic_statistics = {}
+        self.lazy = lazy
+        self.timings = timings if timings is not None else StageTimings()
+        self.assignment_rankings = AssignmentCache(assignments, self.rank_assignment)
+        self.box_plots = AssignmentCache(assignments, self.make_box_plot)
+        self.histograms = AssignmentCache(assignments, self.make_histogram)
+        self.score_plots = AssignmentCache(assignments, self.make_score_plot)
+        self.grade_distributions = AssignmentCache(assignments, self.make_assignment_grade_distribution)
+        self.basic_statistics = AssignmentCache(assignments, self.make_assignment_basic_statistics)
+        self.statistics_summary = None
+        self.percentage_matrix = None
+        self.section_statistics_summary = None
+        self.statistics_lock = threading.Lock()
+
+        # Set once the remaining assignments are being computed in the background
+        self.precompute_lock = threading.Lock()
+        self.precompute_future = None
+        self.precomputed_assignments = 0
+
+        # Every student's rank and percentile on every assignment, in the same row order as the grade matrix
+        self.student_ranks = None
+        self.student_percentiles = None
+        self.assignment_summary = None
+        self.section_means_by_section = None
+        self.student_ranks_lock = threading.Lock()
+
+        # Grades that look like data-entry mistakes, one row per flagged grade (or blank section)
+        self.anomalies = None
+        self.anomalies_lock = threading.Lock()
+
+        # Assignment-to-assignment correlations and per-assignment item analysis
+        self.correlation_matrix = None
+        self.item_analysis = None
+        self.correlation_heatmap = None
+        self.item_analysis_lock = threading.Lock()
+
+        self.student_index = {}
+        self.pseudonyms = None
+
+        self.index_students()
+        self.create_pseudonyms()
+
+        # Every analysis step is a query on this lazy frame, collected only when its result is requested
+        self.grades = self.grade_matrix.lazy().with_columns(self.pseudonyms)
+        self.statuses = self.status_matrix.lazy()
+
+        # In lazy mode, everything is computed the first time it is requested
+        if not self.lazy:
+            self.analyze_all()
+
+    def analyze_all(self) -> None:
+        """
+        Computes every ranking, statistic, distribution and figure that has not been computed yet
+
+        Parameters:
+            None
 
-        self.random_names = {}
-        self.anonymized_assignment_rankings = {}
+        Returns:
+            None
+        """
 
-        self.create_random_names()
         self.rank_students()
         self.make_basic_statistics()
         self.make_grade_distribution()
         self.make_box_plots()
         self.make_histograms()
+        self.make_score_plots()
 
-    def create_random_names(self) -> None:
+    def precompute(self) -> None:
         """
-        Creates random names for the students
+        Computes the statistics, student ranks and anomalies and then every assignment's ranking, distribution and figures one assignment
+        at a time, so the assignments that are done can be shown while the rest are still being computed.
+        Anything already computed (e.g. the assignment being viewed) is skipped.
 
         Parameters:
             None
@@ -47,66 +314,315 @@ class Analyzer:
         Returns:
             None
         """
-        
-        numbers_available = [str(i) for i in range(1, 1000)]
-        random.shuffle(numbers_available)
-        self.random_names = {student.get_name(): numbers_available.pop() for student in self.student_data}
 
-    def rank_students(self) -> None:
+        self.make_basic_statistics()
+        self.make_student_ranks()
+        self.find_anomalies()
+
+        for assignment in self.assignments:
+            self.assignment_rankings[assignment]
+            self.grade_distributions[assignment]
+            self.box_plots[assignment]
+            self.histograms[assignment]
+            self.score_plots[assignment]
+            self.precomputed_assignments += 1
+
+    def start_precompute(self, executor):
+        """
+        Starts precompute on an executor, unless it has already been started (e.g. by another session viewing the same file)
+
+        Parameters:
+            executor (concurrent.futures.Executor): The executor to run precompute on
+
+        Returns:
+            concurrent.futures.Future: The running or finished precompute
+        """
+
+        with self.precompute_lock:
+            if self.precompute_future is None:
+                self.precompute_future = executor.submit(self.precompute)
+
+            return self.precompute_future
+
+    def get_precompute_progress(self) -> tuple[int, int]:
         """
-        Ranks the students based on their grades for each assignment. A missing grade is treated as a -1.
+        Returns how many assignments have been fully computed by precompute
 
         Parameters:
             None
 
         Returns:
+            tuple[int, int]: The number of assignments done and the total number of assignments
+        """
+
+        return self.precomputed_assignments, len(self.assignments)
+
+    def get_estimated_size(self) -> int:
+        """
+        Estimates the memory held by the analyzer: its grade matrices and every table and figure computed so far.
+        Tables count their buffers, and each kind of figure is estimated from a few of them.
+
+        Parameters:
             None
+
+        Returns:
+            int: The estimated size in bytes
         """
 
-        for student in self.student_data:
-            for assignment in self.assignments:
-                grade = str(student.get_grade(assignment))
+        frames = [
+            self.grade_matrix, self.status_matrix, self.statistics_summary, self.section_statistics_summary, self.percentage_matrix,
+            self.student_ranks, self.student_percentiles, self.assignment_summary, self.anomalies, self.correlation_matrix, self.item_analysis
+        ]
+        for cache in [self.assignment_rankings, self.grade_distributions, self.basic_statistics]:
+            frames += list(dict.values(cache))
 
-                # If the grade is not a number, treat it as a -1
-                if grade.count(".") > 1 or not grade.replace(".", "").isdigit():
-                    grade = -1
+        size = sum(df.estimated_size() for df in frames if df is not None)
 
-                # Add the grade to the student's ranking
-                if assignment not in self.assignment_rankings:
-                    self.assignment_rankings[assignment] = {}
-                    self.anonymized_assignment_rankings[assignment] = {}
+        for cache in [self.box_plots, self.histograms, self.score_plots]:
+            figures = list(dict.values(cache))
+            samples = figures[:FIGURE_SIZE_SAMPLES]
 
-                self.assignment_rankings[assignment][student.get_name()] = float(grade)
+            if samples:
+                sample_size = sum(estimate_object_size(figure.to_plotly_json()) for figure in samples)
+                size += sample_size * len(figures) // len(samples)
 
-                # Add the anonymized name to the assignment rankings
-                anonymized_name = f"{self.random_names[student.get_name()]}"
-                self.anonymized_assignment_rankings[assignment][anonymized_name] = float(grade)
+        if self.correlation_heatmap is not None:
+            size += estimate_object_size(self.correlation_heatmap.to_plotly_json())
 
-        # Sort the students by their grades for each assignment
-        for assignment in self.assignments:
-            self.assignment_rankings[assignment] = dict(sorted(self.assignment_rankings[assignment].items(), key=lambda x: x[1], reverse=True))
-            self.anonymized_assignment_rankings[assignment] = dict(sorted(self.anonymized_assignment_rankings[assignment].items(), key=lambda x: x[1], reverse=True))
+        return size
+
+    @classmethod
+    def from_snapshot(cls, snapshot_path, lazy: bool = False) -> "Analyzer":
+        """
+        Creates an analyzer directly from a gradebook snapshot saved with GradeParser.save_snapshot
+
+        Parameters:
+            snapshot_path: Path to the snapshot folder
+            lazy (bool): Whether to compute each assignment's analysis on first request instead of up front
+
+        Returns:
+            Analyzer: The analyzer for the saved gradebook
+        """
+
+        grade_parser = GradeParser.from_snapshot(snapshot_path)
+
+        return cls(
+            grade_parser.get_grade_matrix(),
+            grade_parser.get_raw_assignment_titles(),
+            grade_parser.get_assignment_max_points(),
+            lazy=lazy,
+            status_matrix=grade_parser.get_status_matrix()
+        )
+
+    @classmethod
+    def from_previous(cls, previous: "Analyzer", grade_matrix: pl.DataFrame, assignments: list[str], assignment_max_points: list[float], lazy: bool = False, status_matrix: pl.DataFrame | None = None) -> "Analyzer":
+        """
+        Creates an analyzer for a new export of a gradebook that was already analyzed, reusing
+        everything computed for assignments whose grades did not change
+
+        Parameters:
+            previous (Analyzer): The analyzer of the previous export
+            grade_matrix (pl.DataFrame): The grade matrix of the new export
+            assignments (list[str]): The list of assignment titles of the new export
+            assignment_max_points (list[float]): The list of assignment max points of the new export
+            lazy (bool): Whether to compute each changed assignment's analysis on first request instead of up front
+            status_matrix (pl.DataFrame | None): The Canvas state of each grade of the new export that is not a number
+
+        Returns:
+            Analyzer: The analyzer for the new export
+        """
+
+        analyzer = cls(grade_matrix, assignments, assignment_max_points, lazy=True, status_matrix=status_matrix)
+        analyzer.reuse_unchanged(previous)
+        analyzer.lazy = lazy
+
+        if not lazy:
+            analyzer.analyze_all()
+
+        return analyzer
+
+    def find_unchanged_assignments(self, previous: "Analyzer") -> list[str]:
+        """
+        Compares the grade and status matrices against a previous export's and returns the assignments whose
+        grades, grade states and max points are identical. Assignments are matched by their raw column title, which includes
+        the Canvas assignment ID. If the students or their sections changed, nothing is unchanged.
+
+        Parameters:
+            previous (Analyzer): The analyzer of the previous export
+
+        Returns:
+            list[str]: The unchanged assignments
+        """
+
+        # Rankings and section statistics depend on every student, so the roster must match row for row
+        identity_columns = ["ID", "Name", "Section"]
+        if not self.grade_matrix.select(identity_columns).equals(previous.grade_matrix.select(identity_columns)):
+            return []
+
+        max_points = dict(zip(self.assignments, self.assignment_max_points))
+        previous_max_points = dict(zip(previous.assignments, previous.assignment_max_points))
+        previous_assignments = set(previous.assignments)
+
+        return [
+            assignment for assignment in self.assignments
+            if assignment in previous_assignments
+            and max_points.get(assignment) == previous_max_points.get(assignment)
+            and self.grade_matrix[assignment].equals(previous.grade_matrix[assignment])
+            and self.status_matrix[assignment].equals(previous.status_matrix[assignment])
+        ]
+
+    def reuse_unchanged(self, previous: "Analyzer") -> list[str]:
+        """
+        Copies the rankings, statistics, distributions and figures of unchanged assignments from a
+        previous export's analyzer, so only the changed assignments are computed again
+
+        Parameters:
+            previous (Analyzer): The analyzer of the previous export
+
+        Returns:
+            list[str]: The reused assignments
+        """
+
+        unchanged = self.find_unchanged_assignments(previous)
+        if not unchanged:
+            return unchanged
+
+        caches = [
+            (self.assignment_rankings, previous.assignment_rankings),
+            (self.grade_distributions, previous.grade_distributions),
+            (self.box_plots, previous.box_plots),
+            (self.histograms, previous.histograms),
+            (self.score_plots, previous.score_plots)
+        ]
+
+        for assignment in unchanged:
+            for cache, previous_cache in caches:
+                # Only copy what was already computed; the rest stays lazy
+                if dict.__contains__(previous_cache, assignment):
+                    cache[assignment] = dict.__getitem__(previous_cache, assignment)
+
+        # Only aggregate the changed assignments and merge them with the previous summary rows
+        if previous.statistics_summary is not None:
+            unchanged_set = set(unchanged)
+            changed = [assignment for assignment in self.assignments if assignment not in unchanged_set]
+            summary, section_summary = self.compute_statistics(changed)
+
+            order = pl.DataFrame({"Assignment": self.assignments}, schema={"Assignment": pl.Utf8})
+            self.statistics_summary = order.join(
+                pl.concat([previous.statistics_summary.filter(pl.col("Assignment").is_in(unchanged)), summary], how="vertical_relaxed"),
+                on="Assignment",
+                how="left",
+                maintain_order="left"
+            )
+            self.section_statistics_summary = pl.concat([
+                previous.section_statistics_summary.filter(pl.col("Assignment").is_in(unchanged)),
+                section_summary
+            ], how="vertical_relaxed").sort("Assignment", "Section", maintain_order=True)
+
+        return unchanged
+
+    def index_students(self) -> None:
+        """
+        Indexes the rows of the grade matrix by student ID, since names are not unique
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+
+        self.student_index = {student_id: row for row, student_id in enumerate(self.grade_matrix["ID"])}
+
+        if len(self.student_index) != self.grade_matrix.height:
+            raise ValueError("The grade file contains duplicate student IDs")
+
+    def create_pseudonyms(self) -> None:
+        """
+        Creates a pseudonym for each student from a keyed hash of the student ID, so the same student gets
+        the same pseudonym every time the course is uploaded, even if sections are added or removed. The key is read from
+        the CANVAS_ANALYZER_ANONYMIZATION_KEY environment variable, or made up once per process, so pseudonyms cannot be traced back to IDs.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+
+        # Only the ID is hashed, since anything else about the course (e.g. its sections) can change between exports
+        digests = [
+            hashlib.blake2b(student_id.encode(), key=ANONYMIZATION_KEY).hexdigest().upper()
+            for student_id in self.student_index
+        ]
+
+        # Lengthen the pseudonyms until no two students share one
+        length = PSEUDONYM_LENGTH
+        while len({digest[:length] for digest in digests}) < len(digests):
+            length += 2
+
+        # One entry per row of the grade matrix, so the rankings can carry it as a column
+        self.pseudonyms = pl.Series("Pseudonym", [f"Student {digest[:length]}" for digest in digests], dtype=pl.Utf8)
+
+    def rank_students(self) -> None:
+        """
+        Ranks the students based on their grades for each assignment, with missing grades last.
+        The rankings that are not cached yet are collected together, so Polars runs them in parallel.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+
+        missing = [assignment for assignment in self.assignments if assignment not in self.assignment_rankings]
+
+        with self.timings.stage("ranking"):
+            rankings = pl.collect_all([self.rank_query(assignment) for assignment in missing])
+
+        self.assignment_rankings.update(zip(missing, rankings))
+
+    def rank_query(self, assignment: str) -> pl.LazyFrame:
+        """
+        Returns the query ranking the students based on their grades for one assignment, with missing grades last.
+        Each row also carries the grade's Canvas state (e.g. EX) when it is not a number, and the student's
+        pseudonym, so the anonymized rankings are a projection of the same frame.
 
-            # Extract the names and grades
-            name_column = pl.Series(self.assignment_rankings[assignment].keys())
-            grade_column = pl.Series(self.assignment_rankings[assignment].values())
-            section_column = pl.Series([student.get_section() for student in self.student_data if student.get_name() in name_column])
+        Parameters:
+            assignment (str): The assignment to rank the students for
+
+        Returns:
+            pl.LazyFrame: The assignment rankings query
+        """
 
-            # Convert grades to strings for formatting
-            grade_column = grade_column.cast(pl.Utf8)
+        # Sort the students by their grades, keeping the file order for ties. Each row carries
+        # the student ID, so the name, grade and section always stay aligned
+        return pl.concat([
+            self.grades.select(pl.col("Name"), pl.col("ID"), pl.col(assignment).alias("Grade")),
+            self.statuses.select(pl.col(assignment).alias("Status")),
+            self.grades.select(pl.col("Section"), pl.col("Pseudonym"))
+        ], how="horizontal").sort(
+            # Sorting on whether the grade is missing first keeps the file order when every grade is missing
+            pl.col("Grade").is_null(), pl.col("Grade"),
+            descending=[False, True], nulls_last=True, maintain_order=True
+        )
+
+    def rank_assignment(self, assignment: str) -> pl.DataFrame:
+        """
+        Ranks the students based on their grades for one assignment, with missing grades last.
 
-            # Create a dataframe
-            self.assignment_rankings[assignment] = pl.DataFrame({"Name": name_column, "Grade": grade_column, "Section": section_column})
+        Parameters:
+            assignment (str): The assignment to rank the students for
 
-            # Do the same for the anonymized assignment rankings
-            name_column = pl.Series(self.anonymized_assignment_rankings[assignment].keys())
-            grade_column = pl.Series(self.anonymized_assignment_rankings[assignment].values())
+        Returns:
+            pl.DataFrame: The assignment rankings
+        """
 
-            # Convert grades to strings for formatting
-            grade_column = grade_column.cast(pl.Utf8)
+        with self.timings.stage("ranking"):
+            self.assignment_rankings[assignment] = self.rank_query(assignment).collect()
 
-            # Create a dataframe
-            self.anonymized_assignment_rankings[assignment] = pl.DataFrame({"Name": name_column, "Grade": grade_column})
+        return self.assignment_rankings[assignment]
 
     def get_students_with_grade(self, assignment: pl.DataFrame) -> pl.DataFrame:
         """
@@ -119,14 +635,21 @@ class Analyzer:
             pl.DataFrame: The assignment rankings with only the students who have a grade
         """
 
-        return assignment.filter(pl.col("Grade") != "-1.0")
+        return assignment.filter(pl.col("Grade").is_not_null())
     
     def get_students_without_grade(self, assignment: pl.DataFrame) -> pl.DataFrame:
         """
-        Returns a copy of the assignment rankings with only the students who do not have a grade
+        Returns a copy of the assignment rankings with only the students who do not have a grade,
+        with the Status column saying why (e.g. EX) when Canvas showed something other than a blank
+
+        Parameters:
+            assignment (pl.DataFrame): The assignment rankings
+
+        Returns:
+            pl.DataFrame: The assignment rankings with only the students who do not have a grade
         """
 
-        new_df = assignment.filter(pl.col("Grade") == "-1.0")
+        new_df = assignment.filter(pl.col("Grade").is_null())
 
         # Remove the grade column
         new_df = new_df.drop("Grade")
@@ -135,38 +658,124 @@ class Analyzer:
     
     def make_basic_statistics(self) -> None:
         """
-        Returns the basic statistics of the grades for an assignment
+        Make the basic statistics of the grades for every assignment, overall and per section,
+        in a single aggregation over the grade matrix
 
         Parameters:
             None
 
         Returns:
-            dict: The basic statistics
+            None
         """
 
+        self.ensure_statistics()
+
+        # Fill the per-assignment cache with slices of the summary
         for assignment in self.assignments:
-            cleaned_assignment_rankings = self.get_students_with_grade(self.assignment_rankings[assignment])
-            
-            # Extract just the grade column
-            grade_column = cleaned_assignment_rankings["Grade"]
-
-            # Convert from strings to floats
-            grade_column = grade_column.cast(pl.Float64)
-
-            # Calculate the mean, median, and standard deviation
-            mean = grade_column.mean()
-            median = grade_column.median()
-            std = grade_column.std()
-            data_min = grade_column.min()
-            data_max = grade_column.max()
-
-            # Calculate 25th, 50th, and 75th percentiles
-            q1 = grade_column.quantile(0.25)
-            q2 = grade_column.quantile(0.50)
-            q3 = grade_column.quantile(0.75)
-            
-            # Create a dataframe
-            self.basic_statistics[assignment] = pl.DataFrame({"Mean": mean, "Median": median, "Standard Deviation": std, "Minimum": data_min, "Maximum": data_max, "25th Percentile": q1, "50th Percentile": q2, "75th Percentile": q3})
+            self.basic_statistics[assignment]
+
+    def ensure_statistics(self) -> None:
+        """
+        Computes the statistics summaries if they have not been computed yet
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+
+        with self.statistics_lock:
+            if self.statistics_summary is None:
+                self.statistics_summary, self.section_statistics_summary = self.compute_statistics(self.assignments)
+
+    def compute_statistics(self, assignments: list[str]) -> list[pl.DataFrame]:
+        """
+        Computes the basic statistics of the given assignments, overall and per section, in a single aggregation
+
+        Parameters:
+            assignments (list[str]): The assignments to compute the statistics for
+
+        Returns:
+            list[pl.DataFrame]: The statistics summary (one row per assignment) and the section
+            statistics summary (one row per assignment and section)
+        """
+
+        # One row per (student, assignment) with the grade, so every assignment is aggregated at once
+        grades = self.grades.select("ID", "Section", *assignments).unpivot(
+            index=["ID", "Section"],
+            variable_name="Assignment",
+            value_name="Grade"
+        )
+
+        statistics = get_statistics_expressions("Grade")
+
+        # Both summaries share the same unpivot, so collect them together
+        with self.timings.stage("statistics"):
+            return pl.collect_all([
+                grades.group_by("Assignment", maintain_order=True).agg(statistics),
+                grades.group_by("Assignment", "Section", maintain_order=True).agg(statistics).sort("Assignment", "Section", maintain_order=True)
+            ])
+
+    def make_assignment_basic_statistics(self, assignment: str) -> pl.DataFrame:
+        """
+        Returns the basic statistics of the grades for an assignment, as a slice of the statistics summary
+
+        Parameters:
+            assignment (str): The assignment to get the statistics for
+
+        Returns:
+            pl.DataFrame: The basic statistics
+        """
+
+        summary = self.get_statistics_summary()
+
+        return summary.slice(self.assignments.index(assignment), 1).drop("Assignment")
+
+    def get_statistics_summary(self) -> pl.DataFrame:
+        """
+        Returns the basic statistics of every assignment, one row per assignment
+
+        Parameters:
+            None
+
+        Returns:
+            pl.DataFrame: The statistics summary
+        """
+
+        self.ensure_statistics()
+
+        return self.statistics_summary.clone()
+
+    def get_section_statistics_summary(self) -> pl.DataFrame:
+        """
+        Returns the basic statistics of every assignment broken down by section, one row per assignment and section
+
+        Parameters:
+            None
+
+        Returns:
+            pl.DataFrame: The section statistics summary
+        """
+
+        self.ensure_statistics()
+
+        return self.section_statistics_summary.clone()
+
+    def get_section_statistics(self, assignment: str) -> pl.DataFrame:
+        """
+        Returns the basic statistics of an assignment broken down by section
+
+        Parameters:
+            assignment (str): The assignment to get the statistics for
+
+        Returns:
+            pl.DataFrame: The basic statistics, one row per section
+        """
+
+        self.ensure_statistics()
+
+        return self.section_statistics_summary.filter(pl.col("Assignment") == assignment).drop("Assignment")
 
     def get_basic_statistics(self) -> dict:
         """
@@ -183,7 +792,8 @@ class Analyzer:
     
     def make_grade_distribution(self) -> None:
         """
-        Make a grade distribution of the grades for each assignment
+        Make a grade distribution of the grades for each assignment. The distributions that are
+        not cached yet are collected together, so Polars runs them in parallel.
 
         Parameters:
             None
@@ -192,15 +802,41 @@ class Analyzer:
             None
         """
 
-        self.grade_distributions = {}
+        missing = [assignment for assignment in self.assignments if assignment not in self.grade_distributions]
 
-        for assignment in self.assignments:
-            cleaned_assignment_rankings = self.get_students_with_grade(self.assignment_rankings[assignment])
-            grade_distribution = Counter(cleaned_assignment_rankings["Grade"])
-            
-            # Convert to a dataframe
-            grade_distribution = pl.DataFrame(grade_distribution)
-            self.grade_distributions[assignment] = grade_distribution
+        with self.timings.stage("distributions"):
+            counts = pl.collect_all([self.distribution_query(assignment) for assignment in missing])
+
+        self.grade_distributions.update(zip(missing, counts))
+
+    def distribution_query(self, assignment: str) -> pl.LazyFrame:
+        """
+        Returns the query counting the students with each grade of an assignment, highest grade first
+
+        Parameters:
+            assignment (str): The assignment to count the grades of
+
+        Returns:
+            pl.LazyFrame: The Grade and Count columns
+        """
+
+        return self.grades.select(
+            pl.col(assignment).alias("Grade").drop_nulls().value_counts(name="Count").alias("Counts")
+        ).unnest("Counts").sort("Grade", descending=True)
+
+    def make_assignment_grade_distribution(self, assignment: str) -> pl.DataFrame:
+        """
+        Make a grade distribution of the grades for an assignment
+
+        Parameters:
+            assignment (str): The assignment to make the grade distribution for
+
+        Returns:
+            pl.DataFrame: The grade distribution, one row per grade with its count
+        """
+
+        with self.timings.stage("distributions"):
+            return self.distribution_query(assignment).collect()
 
     def get_grade_distributions(self) -> dict:
         """
@@ -227,9 +863,54 @@ class Analyzer:
         """
 
         for assignment in self.assignments:
-            cleaned_assignment_rankings = self.get_students_with_grade(self.assignment_rankings[assignment])
-            fig = px.box(cleaned_assignment_rankings, y="Grade", color="Section")
-            self.box_plots[assignment] = fig
+            self.box_plots[assignment]
+
+    def make_box_plot(self, assignment: str) -> "go.Figure":
+        """
+        Make a box plot of the grades for an assignment, one box per section. The quartiles and whiskers
+        are computed in Polars, so the figure only holds five numbers per section instead of every grade.
+
+        Parameters:
+            assignment (str): The assignment to make the box plot for
+
+        Returns:
+            go.Figure: The box plot figure
+        """
+
+        go = import_plotly()
+
+        with self.timings.stage("box plots"):
+            grade = pl.col(assignment)
+            q1 = grade.quantile(0.25, interpolation="linear")
+            q3 = grade.quantile(0.75, interpolation="linear")
+
+            # Whiskers reach the furthest grades within 1.5 IQR of the box (Tukey's rule, like Plotly's default)
+            summary = self.grades.select("Section", assignment).drop_nulls().group_by("Section").agg(
+                q1.alias("Q1"),
+                grade.median().alias("Median"),
+                q3.alias("Q3"),
+                grade.filter(grade >= q1 - 1.5 * (q3 - q1)).min().alias("Lower Fence"),
+                grade.filter(grade <= q3 + 1.5 * (q3 - q1)).max().alias("Upper Fence"),
+                grade.mean().alias("Mean")
+            ).sort("Section").collect()
+
+            fig = go.Figure()
+            for row in summary.iter_rows(named=True):
+                fig.add_trace(go.Box(
+                    name=row["Section"],
+                    x=[row["Section"]],
+                    q1=[row["Q1"]],
+                    median=[row["Median"]],
+                    q3=[row["Q3"]],
+                    lowerfence=[row["Lower Fence"]],
+                    upperfence=[row["Upper Fence"]],
+                    mean=[row["Mean"]],
+                    boxmean=True
+                ))
+
+            fig.update_layout(xaxis_title="Section", yaxis_title="Grade", legend_title_text="Section")
+
+            return fig
 
     def get_box_plots(self) -> dict:
         """
@@ -256,9 +937,48 @@ class Analyzer:
         """
 
         for assignment in self.assignments:
-            cleaned_assignment_rankings = self.get_students_with_grade(self.assignment_rankings[assignment])
-            fig = px.histogram(cleaned_assignment_rankings, x="Grade", color="Section", text_auto=True)
-            self.histograms[assignment] = fig
+            self.histograms[assignment]
+
+    def make_histogram(self, assignment: str) -> "go.Figure":
+        """
+        Make a histogram of the grades for an assignment, stacked by section. The bar counts are computed
+        in Polars, so the figure size does not depend on the number of students.
+
+        Parameters:
+            assignment (str): The assignment to make the histogram for
+
+        Returns:
+            go.Figure: The histogram figure
+        """
+
+        go = import_plotly()
+
+        with self.timings.stage("histograms"):
+            grades = self.grade_matrix.select("Section", pl.col(assignment).alias("Grade")).drop_nulls()
+
+            # Few distinct grades (the usual case) get one bar each, otherwise use equal-width bins
+            bin_width = None
+            if grades["Grade"].n_unique() > MAX_DISTINCT_GRADE_BARS:
+                lowest, highest = grades["Grade"].min(), grades["Grade"].max()
+                bin_width = (highest - lowest) / HISTOGRAM_BINS
+                bin_index = ((pl.col("Grade") - lowest) / bin_width).floor().clip(0, HISTOGRAM_BINS - 1)
+                grades = grades.with_columns((lowest + (bin_index + 0.5) * bin_width).alias("Grade"))
+
+            counts = grades.group_by("Section", "Grade").agg(pl.len().alias("Count")).sort("Section", "Grade")
+
+            fig = go.Figure()
+            for (section,), section_counts in counts.group_by("Section", maintain_order=True):
+                fig.add_trace(go.Bar(
+                    name=section,
+                    x=section_counts["Grade"].to_list(),
+                    y=section_counts["Count"].to_list(),
+                    width=bin_width,
+                    text=section_counts["Count"].to_list()
+                ))
+
+            fig.update_layout(barmode="stack", xaxis_title="Grade", yaxis_title="Count", legend_title_text="Section")
+
+            return fig
     
     def get_histograms(self) -> dict:   
         """
@@ -273,19 +993,781 @@ class Analyzer:
 
         return self.histograms.copy()
 
-    def get_assignment_rankings_by_assignment(self, assignment: str, anonymized: bool) -> dict:
+    def make_percentages(self) -> None:
         """
-        Returns the assignment rankings by assignment
+        Converts every grade to a percentage of the assignment's max points in one operation over the grade matrix.
+        Assignments without positive max points (e.g. extra credit worth 0 points) have no percentages.
 
         Parameters:
-            assignment (str): The assignment to get the rankings for
-            anonymized (bool): Whether to anonymize the names
+            None
 
         Returns:
-            dict: The assignment rankings by assignment
+            None
+        """
+
+        with self.timings.stage("percentages"):
+            self.percentage_matrix = self.percentage_query().collect()
+
+    def percentage_query(self) -> pl.LazyFrame:
+        """
+        Returns the query converting every grade to a percentage of the assignment's max points
+
+        Parameters:
+            None
+
+        Returns:
+            pl.LazyFrame: The ID, Name and Section columns and one percentage column per assignment
+        """
+
+        max_points = dict(zip(self.assignments, self.assignment_max_points))
+
+        return self.grades.select(
+            "ID", "Name", "Section",
+            *[
+                (pl.col(assignment) / max_points[assignment] * 100).alias(assignment)
+                if max_points.get(assignment) else pl.lit(None, dtype=pl.Float64).alias(assignment)
+                for assignment in self.assignments
+            ]
+        )
+
+    def get_percentages(self) -> pl.DataFrame:
+        """
+        Returns the grade matrix with every grade as a percentage of the assignment's max points
+
+        Parameters:
+            None
+
+        Returns:
+            pl.DataFrame: The ID, Name and Section columns and one percentage column per assignment
+        """
+
+        if self.percentage_matrix is None:
+            self.make_percentages()
+
+        return self.percentage_matrix.clone()
+
+    def make_student_ranks(self) -> None:
+        """
+        Ranks every student on every assignment at once and computes their percentile (the percentage of
+        graded students at or below their grade), along with each assignment's course and section means
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+
+        with self.student_ranks_lock:
+            if self.student_ranks is not None:
+                return
+
+            with self.timings.stage("student ranks"):
+                ranks, percentiles, course_means, graded = pl.collect_all([
+                    self.grades.select(pl.col(assignment).rank("min", descending=True) for assignment in self.assignments),
+                    self.grades.select((pl.col(assignment).rank("max") / pl.col(assignment).count() * 100).alias(assignment) for assignment in self.assignments),
+                    self.percentage_query().select(pl.col(assignment).mean() for assignment in self.assignments),
+                    self.grades.select(pl.col(assignment).count() for assignment in self.assignments)
+                ])
+
+                # Selecting no columns gives a frame without rows, so there is no first row to read without assignments
+                self.assignment_summary = pl.DataFrame(
+                    {
+                        "Assignment": self.assignments,
+                        "Max Points": self.assignment_max_points,
+                        "Graded": list(graded.row(0)) if self.assignments else [],
+                        "Course Mean (%)": list(course_means.row(0)) if self.assignments else []
+                    },
+                    schema={"Assignment": pl.Utf8, "Max Points": pl.Float64, "Graded": pl.Int64, "Course Mean (%)": pl.Float64}
+                )
+                self.section_means_by_section = {row["Section"]: row for row in self.get_section_means().iter_rows(named=True)}
+                self.student_percentiles = percentiles
+                self.student_ranks = ranks
+
+    def get_student_report(self, student_id: str) -> pl.DataFrame:
+        """
+        Returns one student's grade, percentage, rank, percentile and section and course means on every
+        assignment, read from a single row of the precomputed ranks
+
+        Parameters:
+            student_id (str): The student's ID
+
+        Returns:
+            pl.DataFrame: One row per assignment
+        """
+
+        if student_id not in self.student_index:
+            raise KeyError(student_id)
+
+        self.make_student_ranks()
+
+        row = self.student_index[student_id]
+        grades = self.grade_matrix.row(row, named=True)
+        statuses = self.status_matrix.row(row, named=True)
+        ranks = self.student_ranks.row(row) if self.assignments else []
+        percentiles = self.student_percentiles.row(row) if self.assignments else []
+        section_means = self.section_means_by_section.get(grades["Section"], {})
+
+        return self.assignment_summary.with_columns(
+            pl.Series("Grade", [grades[assignment] for assignment in self.assignments], dtype=pl.Float64),
+            pl.Series("Status", [statuses[assignment] for assignment in self.assignments], dtype=pl.Utf8),
+            pl.Series("Rank", ranks, dtype=pl.UInt32),
+            pl.Series("Percentile", percentiles, dtype=pl.Float64),
+            pl.Series("Section Mean (%)", [section_means.get(assignment) for assignment in self.assignments], dtype=pl.Float64)
+        ).select(
+            "Assignment", "Grade", "Status", "Max Points",
+            pl.when(pl.col("Max Points") > 0).then(pl.col("Grade") / pl.col("Max Points") * 100).alias("Percentage"),
+            "Rank", "Graded", "Percentile", "Section Mean (%)", "Course Mean (%)"
+        )
+
+    def find_anomalies(self) -> None:
+        """
+        Flags grades that look like data-entry mistakes in one pass over every grade of every student:
+            Above max points: The grade is higher than the assignment's max points, if it is worth any points
+            Negative grade: The grade is below zero
+            Unusual for the assignment: The grade is more than ANOMALY_Z_SCORE standard deviations from the assignment's mean
+            Unusual for the student: The percentage is at least ANOMALY_STUDENT_RATIO times the student's median percentage
+            Blank for the whole section: No student in the section has a grade, but students in other sections do
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+
+        with self.anomalies_lock:
+            if self.anomalies is not None:
+                return
+
+            with self.timings.stage("anomalies"):
+                assignment_table = pl.DataFrame(
+                    {"Assignment": self.assignments, "Max Points": self.assignment_max_points, "Order": range(len(self.assignments))},
+                    schema={"Assignment": pl.Utf8, "Max Points": pl.Float64, "Order": pl.Int64}
+                ).lazy()
+
+                # One row per (student, assignment), with the statistics each check compares against
+                grade = pl.col("Grade")
+                max_points = pl.col("Max Points")
+                percentage = pl.when(max_points > 0).then(grade / max_points * 100)
+                cells = self.grades.select("ID", "Name", "Pseudonym", "Section", *self.assignments).unpivot(
+                    index=["ID", "Name", "Pseudonym", "Section"],
+                    variable_name="Assignment",
+                    value_name="Grade"
+                ).with_columns(
+                    # Without any assignments the unpivot has no grades to take the type from
+                    grade.cast(pl.Float64)
+                ).join(assignment_table, on="Assignment", how="left").with_columns(
+                    # Assignments where every student has the same grade have no spread to compare against
+                    pl.when(grade.std().over("Assignment") > 0)
+                        .then((grade - grade.mean().over("Assignment")) / grade.std().over("Assignment"))
+                        .alias("Z-Score"),
+                    percentage.alias("Percentage"),
+                    percentage.median().over("ID").alias("Student Median (%)")
+                )
+
+                columns = ["Issue", "Order", "Assignment", "Section", "ID", "Name", "Pseudonym", "Grade", "Max Points", "Detail"]
+                flagged = [
+                    # Extra credit worth 0 points has no max to go over, like in percentage_query
+                    cells.filter((max_points > 0) & (grade > max_points)).with_columns(
+                        pl.lit("Above max points").alias("Issue"),
+                        pl.format("{} of {} points", grade, max_points).alias("Detail")
+                    ),
+                    cells.filter(grade < 0).with_columns(
+                        pl.lit("Negative grade").alias("Issue"),
+                        pl.format("{} points", grade).alias("Detail")
+                    ),
+                    cells.filter(pl.col("Z-Score").abs() > ANOMALY_Z_SCORE).with_columns(
+                        pl.lit("Unusual for the assignment").alias("Issue"),
+                        pl.format("{} standard deviations from the mean", pl.col("Z-Score").round(1)).alias("Detail")
+                    ),
+                    cells.filter((pl.col("Student Median (%)") > 0) & (pl.col("Percentage") >= ANOMALY_STUDENT_RATIO * pl.col("Student Median (%)"))).with_columns(
+                        pl.lit("Unusual for the student").alias("Issue"),
+                        pl.format("{}% against a usual {}%", pl.col("Percentage").round(1), pl.col("Student Median (%)").round(1)).alias("Detail")
+                    ),
+                    # Sections where nobody has a grade yet, for assignments that other sections already have grades for
+                    cells.group_by("Assignment", "Order", "Max Points", "Section").agg(
+                        grade.count().alias("Graded"),
+                        pl.len().alias("Students")
+                    ).filter(
+                        (pl.col("Graded") == 0) & (pl.col("Graded").sum().over("Assignment") > 0)
+                    ).with_columns(
+                        pl.lit("Blank for the whole section").alias("Issue"),
+                        pl.lit(None, dtype=pl.Utf8).alias("ID"),
+                        pl.lit(None, dtype=pl.Utf8).alias("Name"),
+                        pl.lit(None, dtype=pl.Utf8).alias("Pseudonym"),
+                        pl.lit(None, dtype=pl.Float64).alias("Grade"),
+                        pl.format("0 of {} students graded", pl.col("Students")).alias("Detail")
+                    )
+                ]
+
+                self.anomalies = pl.concat([query.select(columns) for query in flagged]).sort(
+                    "Order", "Section", "ID", nulls_last=True, maintain_order=True
+                ).drop("Order").collect()
+
+    def get_anomalies(self, anonymized: bool) -> pl.DataFrame:
+        """
+        Returns the grades that look like data-entry mistakes, found by find_anomalies
+
+        Parameters:
+            anonymized (bool): Whether to anonymize the names
+
+        Returns:
+            pl.DataFrame: One row per flagged grade or blank section with the issue, assignment, section, student, grade and details
+        """
+
+        self.find_anomalies()
+
+        # The ID would give away who a pseudonym belongs to
+        if anonymized:
+            return self.anomalies.select("Issue", "Assignment", "Section", pl.col("Pseudonym").alias("Name"), "Grade", "Max Points", "Detail")
+
+        return self.anomalies.drop("Pseudonym")
+
+    def make_item_analysis(self) -> None:
+        """
+        Computes the correlation between every pair of assignments over the students graded on both, and each
+        assignment's item analysis, with a handful of matrix products instead of one pass per pair:
+            Missing (%): The share of students without a grade
+            Mean (%): The mean grade as a percentage of the max points
+            Ceiling (%): The share of graded students at or above the max points
+            Floor (%): The share of graded students at or below zero
+            Discrimination: The correlation between the grade and the student's average percentage on every
+            other assignment, so a high value means the assignment separates stronger and weaker students
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+
+        import numpy as np
+
+        with self.item_analysis_lock:
+            if self.correlation_matrix is not None:
+                return
+
+            with self.timings.stage("item analysis"):
+                grades = self.grade_matrix.select(self.assignments).to_numpy().astype(np.float64) if self.assignments else np.empty((self.grade_matrix.height, 0))
+                graded = ~np.isnan(grades)
+                present = graded.astype(np.float64)
+                filled = np.where(graded, grades, 0.0)
+
+                # Sums over the students graded on both assignments of each pair, for every pair at once
+                pair_counts = present.T @ present
+                pair_sums = filled.T @ present
+                pair_squares = (filled * filled).T @ present
+                pair_products = filled.T @ filled
+
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    covariance = pair_products - pair_sums * pair_sums.T / pair_counts
+                    variance = pair_squares - pair_sums * pair_sums / pair_counts
+                    correlation = covariance / np.sqrt(variance * variance.T)
+
+                # The one-pass sums leave rounding residue instead of a zero variance for constant grades like 7.3
+                constant = variance <= ZERO_VARIANCE_TOLERANCE * pair_squares
+                correlation[(pair_counts < MIN_CORRELATION_STUDENTS) | constant | constant.T | ~np.isfinite(correlation)] = np.nan
+                np.fill_diagonal(correlation, np.where(np.isnan(np.diag(correlation)), np.nan, 1.0))
+
+                # Each student's average percentage on the other assignments, for every assignment at once
+                max_points = np.array([points if points and points > 0 else np.nan for points in self.assignment_max_points], dtype=np.float64)
+                percentages = grades / max_points * 100
+                percentage_graded = ~np.isnan(percentages)
+                percentage_filled = np.where(percentage_graded, percentages, 0.0)
+                other_counts = percentage_graded.sum(axis=1, keepdims=True) - percentage_graded
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    other_means = (percentage_filled.sum(axis=1, keepdims=True) - percentage_filled) / other_counts
+
+                discrimination = self.masked_column_correlation(grades, other_means, graded & (other_counts > 0))
+
+                graded_counts = graded.sum(axis=0)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    self.item_analysis = pl.DataFrame(
+                        {
+                            "Assignment": self.assignments,
+                            "Graded": graded_counts,
+                            "Missing (%)": (1 - graded_counts / len(grades)) * 100,
+                            "Mean (%)": percentage_filled.sum(axis=0) / percentage_graded.sum(axis=0),
+                            "Ceiling (%)": (grades >= max_points).sum(axis=0) / graded_counts * 100,
+                            "Floor (%)": (grades <= 0).sum(axis=0) / graded_counts * 100,
+                            "Discrimination": discrimination
+                        },
+                        schema_overrides={"Assignment": pl.Utf8},
+                        nan_to_null=True
+                    )
+
+                self.correlation_matrix = pl.DataFrame({"Assignment": self.assignments}, schema={"Assignment": pl.Utf8}).hstack(
+                    pl.DataFrame(correlation, schema=self.assignments, orient="row", nan_to_null=True)
+                )
+
+    def masked_column_correlation(self, first, second, mask):
+        """
+        Returns the correlation between each column of two matrices over the rows where the mask is set
+
+        Parameters:
+            first (np.ndarray): The first matrix, students by assignments
+            second (np.ndarray): The second matrix, the same shape as the first
+            mask (np.ndarray): Which cells to use
+
+        Returns:
+            np.ndarray: One correlation per column, NaN where there are too few cells or no variation
+        """
+
+        import numpy as np
+
+        counts = mask.sum(axis=0)
+        first = np.where(mask, first, 0.0)
+        second = np.where(mask, second, 0.0)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            first_centered = np.where(mask, first - first.sum(axis=0) / counts, 0.0)
+            second_centered = np.where(mask, second - second.sum(axis=0) / counts, 0.0)
+            first_variance = (first_centered ** 2).sum(axis=0)
+            second_variance = (second_centered ** 2).sum(axis=0)
+            correlation = (first_centered * second_centered).sum(axis=0) / np.sqrt(first_variance * second_variance)
+
+        # The mean of constant grades like 7.3 is not exact, so their centered values are rounding residue rather than zeros
+        constant = (first_variance <= ZERO_VARIANCE_TOLERANCE * (first ** 2).sum(axis=0)) | (second_variance <= ZERO_VARIANCE_TOLERANCE * (second ** 2).sum(axis=0))
+        correlation[(counts < MIN_CORRELATION_STUDENTS) | constant | ~np.isfinite(correlation)] = np.nan
+
+        return correlation
+
+    def get_correlation_matrix(self) -> pl.DataFrame:
+        """
+        Returns the correlation between every pair of assignments, over the students graded on both
+
+        Parameters:
+            None
+
+        Returns:
+            pl.DataFrame: The Assignment column and one correlation column per assignment
+        """
+
+        self.make_item_analysis()
+
+        return self.correlation_matrix.clone()
+
+    def get_item_analysis(self) -> pl.DataFrame:
+        """
+        Returns each assignment's missing rate, mean, ceiling and floor effects and discrimination
+
+        Parameters:
+            None
+
+        Returns:
+            pl.DataFrame: One row per assignment
+        """
+
+        self.make_item_analysis()
+
+        return self.item_analysis.clone()
+
+    def get_correlation_heatmap(self) -> "go.Figure":
+        """
+        Returns a heatmap of the correlation between every pair of assignments
+
+        Parameters:
+            None
+
+        Returns:
+            go.Figure: The heatmap figure
+        """
+
+        go = import_plotly()
+
+        self.make_item_analysis()
+
+        with self.item_analysis_lock:
+            if self.correlation_heatmap is None:
+                # Plotly cannot draw a heatmap of an empty matrix, so a gradebook without assignments gets an empty figure
+                fig = go.Figure(go.Heatmap(
+                    z=self.correlation_matrix.drop("Assignment").to_numpy(),
+                    x=self.assignments,
+                    y=self.assignments,
+                    zmin=-1,
+                    zmax=1,
+                    colorscale="RdBu",
+                    colorbar_title_text="Correlation"
+                ) if self.assignments else [])
+                fig.update_layout(yaxis_autorange="reversed", height=max(400, 12 * len(self.assignments)))
+
+                self.correlation_heatmap = fig
+
+        return self.correlation_heatmap
+
+    def get_student_labels(self, anonymized: bool) -> dict:
+        """
+        Returns the label to show for each student when choosing one, by student ID
+
+        Parameters:
+            anonymized (bool): Whether to label students by their pseudonym instead of their name
+
+        Returns:
+            dict: The label of each student ID
+        """
+
+        if anonymized:
+            return dict(zip(self.grade_matrix["ID"], self.pseudonyms))
+
+        return {student_id: f"{name} ({student_id})" for student_id, name in zip(self.grade_matrix["ID"], self.grade_matrix["Name"])}
+
+    def average_percentage_expression(self) -> pl.Expr:
+        """
+        Returns the expression for a student's average percentage over the assignments they have a grade for
+
+        Parameters:
+            None
+
+        Returns:
+            pl.Expr: The Average (%) column, null for every student if there are no assignments
+        """
+
+        # Polars cannot average over an empty list of columns
+        if not self.assignments:
+            return pl.lit(None, dtype=pl.Float64).alias("Average (%)")
+
+        return pl.mean_horizontal(self.assignments).alias("Average (%)")
+
+    def student_averages_query(self) -> pl.LazyFrame:
+        """
+        Returns the query for each student's average percentage over the assignments they have a grade for
+
+        Parameters:
+            None
+
+        Returns:
+            pl.LazyFrame: The ID, Name, Pseudonym, Section, average percentage and number of graded assignments per student
+        """
+
+        # Aggregated straight from the percentage query, without building the percentage matrix
+        return self.percentage_query().with_columns(self.pseudonyms).select(
+            "ID", "Name", "Pseudonym", "Section",
+            self.average_percentage_expression(),
+            (
+                pl.sum_horizontal([pl.col(assignment).is_not_null() for assignment in self.assignments])
+                if self.assignments else pl.lit(0, dtype=pl.UInt32)
+            ).alias("Graded Assignments")
+        ).sort("Average (%)", descending=True, nulls_last=True, maintain_order=True)
+
+    def get_student_averages(self, anonymized: bool = False) -> pl.DataFrame:
+        """
+        Returns each student's average percentage over the assignments they have a grade for
+
+        Parameters:
+            anonymized (bool): Whether to show the pseudonyms instead of the names and IDs
+
+        Returns:
+            pl.DataFrame: The ID (left out when anonymized), Name, Section, average percentage and number of graded assignments per student
         """
 
+        return self.student_averages_query().select(self.get_student_average_columns(anonymized)).collect()
+
+    def get_student_average_columns(self, anonymized: bool) -> list[pl.Expr]:
+        """
+        Returns the columns of the student averages shown in the requested view
+
+        Parameters:
+            anonymized (bool): Whether to show the pseudonyms instead of the names and IDs
+
+        Returns:
+            list[pl.Expr]: The columns to select
+        """
+
+        # The ID would give away who a pseudonym belongs to
         if anonymized:
-            return self.anonymized_assignment_rankings[assignment].clone()
+            return [pl.col("Pseudonym").alias("Name"), pl.col("Section"), pl.col("Average (%)"), pl.col("Graded Assignments")]
+
+        return [pl.col("ID"), pl.col("Name"), pl.col("Section"), pl.col("Average (%)"), pl.col("Graded Assignments")]
+
+    def get_student_average_page(self, anonymized: bool, search: str = "", sections: list[str] | None = None, sort_by: str | None = None,
+                                 descending: bool = False, page: int = 1, page_size: int = 50) -> tuple[pl.DataFrame, int]:
+        """
+        Returns one page of the student averages after searching, filtering and sorting them, so only
+        the rows being shown have to be sent to the browser
+
+        Parameters:
+            anonymized (bool): Whether to show the pseudonyms instead of the names and IDs
+            search (str): Text the student's name or ID must contain, ignoring case (only the pseudonym when anonymized)
+            sections (list[str] | None): The sections to keep, or None to keep every section
+            sort_by (str | None): The column to sort by, or None to keep the highest averages first
+            descending (bool): Whether to sort from highest to lowest
+            page (int): The page to return, starting at 1
+            page_size (int): The number of students per page
+
+        Returns:
+            tuple[pl.DataFrame, int]: The page of student averages and the number of students matching the search and filters
+        """
+
+        return self.page_query(
+            self.student_averages_query(), self.get_student_average_columns(anonymized), anonymized, search, sections, sort_by, descending, page, page_size
+        )
+
+    def get_section_means(self) -> pl.DataFrame:
+        """
+        Returns each section's mean percentage for every assignment and over all assignments
+
+        Parameters:
+            None
+
+        Returns:
+            pl.DataFrame: One row per section with its number of students, overall mean and one mean per assignment
+        """
+
+        percentages = self.percentage_query().with_columns(self.average_percentage_expression())
+
+        return percentages.group_by("Section").agg(
+            pl.len().alias("Students"),
+            pl.col("Average (%)").mean(),
+            pl.col(self.assignments).mean()
+        ).sort("Section").collect()
+
+    def get_category_totals(self, categories: dict, weights: dict | None = None) -> pl.DataFrame:
+        """
+        Returns each student's total per assignment category (points earned over points possible on the graded
+        assignments of the category) and, if weights are given, their weighted total across categories.
+        The export does not say which group an assignment belongs to, so the mapping has to be provided.
+
+        Parameters:
+            categories (dict): Maps assignment titles to their category name; unmapped assignments are left out
+            weights (dict | None): Maps category names to their weight, e.g. {"Homework": 0.4, "Exams": 0.6}
+
+        Returns:
+            pl.DataFrame: The ID, Name and Section columns, one percentage column per category and,
+            if weights are given, a "Weighted Total (%)" column
+        """
+
+        max_points = dict(zip(self.assignments, self.assignment_max_points))
+        category_table = pl.DataFrame(
+            {
+                "Assignment": [assignment for assignment in self.assignments if assignment in categories],
+                "Category": [categories[assignment] for assignment in self.assignments if assignment in categories],
+                "Max Points": [max_points.get(assignment) for assignment in self.assignments if assignment in categories]
+            },
+            schema={"Assignment": pl.Utf8, "Category": pl.Utf8, "Max Points": pl.Float64}
+        )
+
+        # One row per (student, assignment), then one group-by per (student, category)
+        graded_max_points = pl.col("Max Points").filter(pl.col("Grade").is_not_null()).sum()
+        totals = self.grades.select("ID", *category_table["Assignment"]).unpivot(
+            index="ID",
+            variable_name="Assignment",
+            value_name="Grade"
+        ).join(category_table.lazy(), on="Assignment").group_by("ID", "Category").agg(
+            # Categories worth no points (e.g. only extra credit) have no percentage, like in percentage_query
+            pl.when((pl.col("Grade").count() > 0) & (graded_max_points > 0))
+                .then(pl.col("Grade").sum() / graded_max_points * 100)
+                .alias("Percentage")
+        ).collect()
+
+        category_names = category_table["Category"].unique(maintain_order=True).to_list()
+        if not category_names:
+            return self.grade_matrix.select("ID", "Name", "Section")
+
+        totals = totals.pivot(on="Category", index="ID", values="Percentage")
+
+        result = self.grade_matrix.select("ID", "Name", "Section").join(totals, on="ID", how="left", maintain_order="left")
+        result = result.select("ID", "Name", "Section", *[pl.col(category).alias(f"{category} (%)") for category in category_names])
+
+        # Weights are renormalized per student over the categories they have grades in
+        if weights and any(category in weights for category in category_names):
+            weighted = [pl.col(f"{category} (%)") * weights[category] for category in category_names if category in weights]
+            used_weights = [pl.col(f"{category} (%)").is_not_null() * weights[category] for category in category_names if category in weights]
+            total_weight = pl.sum_horizontal(used_weights)
+            result = result.with_columns(
+                pl.when(total_weight > 0).then(pl.sum_horizontal(weighted) / total_weight).alias("Weighted Total (%)")
+            )
+
+        return result
+
+    def get_timings(self) -> StageTimings:
+        """
+        Returns the time and memory recorded for each analysis stage so far
+
+        Parameters:
+            None
+
+        Returns:
+            StageTimings: The stage timings
+        """
+
+        return self.timings
+
+    def make_score_plots(self) -> None:
+        """
+        Make score plots of the grades for each assignment
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+
+        for assignment in self.assignments:
+            self.score_plots[assignment]
+
+    def make_score_plot(self, assignment: str) -> "go.Figure":
+        """
+        Make a per-student plot of the grades for an assignment against their rank, one WebGL trace per
+        section so it stays responsive with thousands of students. Names are left out so the plot is safe
+        to show while anonymized.
+
+        Parameters:
+            assignment (str): The assignment to make the score plot for
+
+        Returns:
+            go.Figure: The score plot figure
+        """
+
+        go = import_plotly()
+
+        with self.timings.stage("score plots"):
+            grades = self.grades.select(
+                "Section",
+                pl.col(assignment).alias("Grade"),
+                pl.col(assignment).rank("min", descending=True).alias("Rank")
+            ).drop_nulls().sort("Section").collect()
+
+            fig = go.Figure()
+            for (section,), section_grades in grades.group_by("Section", maintain_order=True):
+                fig.add_trace(go.Scattergl(
+                    name=section,
+                    x=section_grades["Rank"].to_list(),
+                    y=section_grades["Grade"].to_list(),
+                    mode="markers"
+                ))
+
+            fig.update_layout(xaxis_title="Rank", yaxis_title="Grade", legend_title_text="Section")
+
+            return fig
+
+    def get_score_plots(self) -> dict:
+        """
+        Returns the score plots
+
+        Parameters:
+            None
+
+        Returns:
+            dict: The score plots
+        """
+
+        return self.score_plots.copy()
+
+    def get_assignment_rankings_by_assignment(self, assignment: str, anonymized: bool) -> dict:
+        """
+        Returns the assignment rankings by assignment
+
+        Parameters:
+            assignment (str): The assignment to get the rankings for
+            anonymized (bool): Whether to anonymize the names
+
+        Returns:
+            dict: The assignment rankings by assignment
+        """
+
+        rankings = self.assignment_rankings[assignment]
+
+        # Selecting columns shares the ranking's data, so neither view copies it
+        if anonymized:
+            return rankings.select(pl.col("Pseudonym").alias("Name"), pl.col("Grade"), pl.col("Status"))
         else:
-            return self.assignment_rankings[assignment].clone()
\ No newline at end of file
+            return rankings.drop("Pseudonym")
+
+    def get_sections(self) -> list[str]:
+        """
+        Returns the sections of the course
+
+        Parameters:
+            None
+
+        Returns:
+            list[str]: The section names, sorted
+        """
+
+        return sorted(self.grade_matrix["Section"].drop_nulls().unique().to_list())
+
+    def get_ranking_page(self, assignment: str, anonymized: bool, graded: bool = True, search: str = "", sections: list[str] | None = None,
+                         sort_by: str | None = None, descending: bool = False, page: int = 1, page_size: int = 50) -> tuple[pl.DataFrame, int]:
+        """
+        Returns one page of an assignment's rankings after searching, filtering and sorting them, so only
+        the rows being shown have to be sent to the browser. Graded students get a Rank column (tied grades
+        share a rank), which stays the same whatever the search or sort.
+
+        Parameters:
+            assignment (str): The assignment to get the rankings for
+            anonymized (bool): Whether to anonymize the names
+            graded (bool): Whether to page through the students with a grade or those without one
+            search (str): Text the student's name or ID must contain, ignoring case (only the pseudonym when anonymized)
+            sections (list[str] | None): The sections to keep, or None to keep every section
+            sort_by (str | None): The column to sort by, or None to keep the ranking order
+            descending (bool): Whether to sort from highest to lowest
+            page (int): The page to return, starting at 1
+            page_size (int): The number of students per page
+
+        Returns:
+            tuple[pl.DataFrame, int]: The page of rankings and the number of students matching the search and filters
+        """
+
+        rankings = self.assignment_rankings[assignment]
+
+        if graded:
+            query = rankings.lazy().filter(pl.col("Grade").is_not_null()).with_columns(
+                pl.col("Grade").rank("min", descending=True).alias("Rank")
+            )
+        else:
+            query = rankings.lazy().filter(pl.col("Grade").is_null())
+
+        if anonymized:
+            columns = [pl.col("Pseudonym").alias("Name"), pl.col("Grade"), pl.col("Status")]
+        else:
+            columns = [pl.col("Name"), pl.col("ID"), pl.col("Grade"), pl.col("Status"), pl.col("Section")]
+
+        if graded:
+            columns.insert(0, pl.col("Rank"))
+        else:
+            columns = [column for column in columns if column.meta.output_name() != "Grade"]
+
+        return self.page_query(query, columns, anonymized, search, sections, sort_by, descending, page, page_size)
+
+    def page_query(self, query: pl.LazyFrame, columns: list[pl.Expr], anonymized: bool, search: str, sections: list[str] | None,
+                   sort_by: str | None, descending: bool, page: int, page_size: int) -> tuple[pl.DataFrame, int]:
+        """
+        Searches, filters, sorts and pages a table with one row per student, keeping only the columns of the requested view
+
+        Parameters:
+            query (pl.LazyFrame): The table, with the Name, ID, Pseudonym and Section columns
+            columns (list[pl.Expr]): The columns of the requested view
+            anonymized (bool): Whether to search the pseudonyms instead of the names and IDs
+            search (str): Text the student's name or ID must contain, ignoring case
+            sections (list[str] | None): The sections to keep, or None to keep every section
+            sort_by (str | None): The column to sort by, or None to keep the table's order
+            descending (bool): Whether to sort from highest to lowest
+            page (int): The page to return, starting at 1
+            page_size (int): The number of students per page
+
+        Returns:
+            tuple[pl.DataFrame, int]: The page of the table and the number of students matching the search and filters
+        """
+
+        # Filter on the full table, then keep only the columns of the requested view
+        if sections:
+            query = query.filter(pl.col("Section").is_in(sections))
+
+        if search:
+            search_columns = ["Pseudonym"] if anonymized else ["Name", "ID"]
+            query = query.filter(pl.any_horizontal(
+                pl.col(column).str.to_lowercase().str.contains(search.lower(), literal=True) for column in search_columns
+            ))
+
+        query = query.select(columns)
+
+        if sort_by is not None:
+            query = query.sort(sort_by, descending=descending, nulls_last=True, maintain_order=True)
+
+        # The page and the number of matches share the same filtering
+        offset = max(page - 1, 0) * page_size
+        page_rows, total = pl.collect_all([query.slice(offset, page_size), query.select(pl.len())])
+
+        return page_rows, total.item()
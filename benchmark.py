@@ -0,0 +1,263 @@
+import argparse
+import csv
+import gc
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import polars as pl
+from analyzer import Analyzer
+from grade_parser import GradeParser
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+FIRST_NAMES = ["Alex", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn", "Drew", "Sam", "Kai"]
+LAST_NAMES = ["Nguyen", "Garcia", "Smith", "Johnson", "Lee", "Patel", "Brown", "Martinez", "Kim", "Davis", "Lopez", "Wilson"]
+ASSIGNMENT_GROUPS = [("Homework", 10.0), ("Quiz", 20.0), ("Lab", 5.0), ("Exam", 100.0)]
+
+# Seconds each module may take to import in a fresh process, including what it imports (mostly Polars).
+# None of them may import Plotly, which is only needed once a figure is made.
+IMPORT_TIME_BUDGETS = {
+    "instrumentation": 0.5,
+    "student": 0.05,
+    "parse_cache": 0.05,
+    "grade_parser": 0.5,
+    "analyzer": 0.5,
+    "longitudinal": 0.5,
+    "cli": 0.5
+}
+
+def generate_gradebook(path: Path, students: int, assignments: int, sections: int, seed: int = 0) -> None:
+    """
+    Writes a synthetic Canvas "Export Entire Gradebook" CSV: the posting and Points Possible rows,
+    the Current/Unposted/Final score columns per assignment group and overall, blank, EX and
+    non-numeric cells, and the test student row at the end
+
+    Parameters:
+        path (Path): Where to write the CSV
+        students (int): The number of students
+        assignments (int): The number of assignment columns
+        sections (int): The number of sections
+        seed (int): The random seed, so the same arguments always write the same file
+
+    Returns:
+        None
+    """
+
+    rng = random.Random(seed)
+
+    # Spread the assignments over the groups, each with its own max points
+    assignment_columns = []
+    max_points = []
+    for index in range(assignments):
+        group, points = ASSIGNMENT_GROUPS[index % len(ASSIGNMENT_GROUPS)]
+        assignment_columns.append(f"{group} {index // len(ASSIGNMENT_GROUPS) + 1} ({100000 + index})")
+        max_points.append(points)
+
+    score_columns = []
+    for group, _ in ASSIGNMENT_GROUPS:
+        score_columns += [f"{group} Current Score", f"{group} Unposted Current Score", f"{group} Final Score", f"{group} Unposted Final Score"]
+    score_columns += ["Current Score", "Unposted Current Score", "Final Score", "Unposted Final Score"]
+
+    identity_columns = ["Student", "ID", "SIS User ID", "SIS Login ID", "Section"]
+    section_names = [f"COURSE 101-{500 + index}" for index in range(sections)]
+
+    with open(path, "w", newline="") as file_object:
+        writer = csv.writer(file_object)
+        writer.writerow(identity_columns + assignment_columns + score_columns)
+        writer.writerow(["    Manual Posting", "", "", "", ""] + ["Manual Posting"] * assignments + [""] * len(score_columns))
+        writer.writerow(["    Points Possible", "", "", "", ""] + [f"{points:.2f}" for points in max_points] + ["(read only)"] * len(score_columns))
+
+        for student in range(students):
+            # Names are drawn from small pools, so large courses have duplicate names like real ones
+            name = f"{rng.choice(LAST_NAMES)}, {rng.choice(FIRST_NAMES)}"
+            grades = []
+            for points in max_points:
+                roll = rng.random()
+                if roll < 0.08:
+                    grades.append("")
+                elif roll < 0.10:
+                    grades.append("EX")
+                elif roll < 0.105:
+                    grades.append("incomplete")
+                else:
+                    grades.append(f"{min(points, max(0.0, rng.gauss(0.8, 0.15) * points)):.2f}")
+
+            scores = [f"{rng.uniform(50, 100):.2f}"] * len(score_columns)
+            writer.writerow([name, str(200000 + student), f"S{student:07d}", f"user{student}", section_names[student % sections]] + grades + scores)
+
+        writer.writerow(["Student, Test", "199999", "", "", section_names[0]] + ["0.00"] * assignments + ["0.00"] * len(score_columns))
+
+def measure(stage: str, prepare) -> dict:
+    """
+    Measures one stage: its wall time and how much it raised the process's peak resident memory,
+    then, in a second run, the peak memory allocated by Python (tracemalloc slows the code down,
+    so it is kept out of the timed run)
+
+    Parameters:
+        stage (str): The name of the stage
+        prepare: Callable returning a fresh zero-argument callable that runs the stage
+
+    Returns:
+        dict: The stage name, seconds, resident peak increase in MB and Python peak in MB
+    """
+
+    function = prepare()
+    gc.collect()
+    peak_rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else 0
+
+    start = time.perf_counter()
+    function()
+    seconds = time.perf_counter() - start
+
+    # ru_maxrss is in kilobytes on Linux
+    peak_rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else 0
+
+    function = prepare()
+    gc.collect()
+    tracemalloc.start()
+    function()
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "Stage": stage,
+        "Seconds": seconds,
+        "RSS Peak Increase (MB)": (peak_rss_after - peak_rss_before) / 1024,
+        "Python Peak (MB)": python_peak / (1024 * 1024)
+    }
+
+def measure_import(module: str) -> dict:
+    """
+    Measures how long a module takes to import in a fresh Python process, and whether it imports Plotly
+
+    Parameters:
+        module (str): The module name
+
+    Returns:
+        dict: The module name, seconds, budget in seconds and whether Plotly was imported
+    """
+
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(json.dumps({'seconds': time.perf_counter() - start, 'plotly': 'plotly' in sys.modules}))"
+    )
+    output = subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).resolve().parent, capture_output=True, text=True, check=True).stdout
+    result = json.loads(output.splitlines()[-1])
+
+    return {
+        "Module": module,
+        "Seconds": result["seconds"],
+        "Budget": IMPORT_TIME_BUDGETS.get(module),
+        "Plotly Imported": result["plotly"]
+    }
+
+def run_benchmark(path: Path, include_figures: bool = True) -> list[dict]:
+    """
+    Times each parsing and analysis stage on a gradebook export
+
+    Parameters:
+        path (Path): The Canvas grade export CSV
+        include_figures (bool): Whether to also time building the box plots, histograms and score plots
+
+    Returns:
+        list[dict]: One measurement per stage
+    """
+
+    results = []
+
+    # Parse once so each stage below can be run on its own
+    grade_parser = GradeParser(path)
+    scan = grade_parser.scan_dataframe()
+    header = scan.collect_schema().names()
+    max_points_row = scan.head(2).collect().filter(pl.col("Student").str.contains("Points Possible")).row(0)
+
+    # The header and the Points Possible row are all parse_info reads before building the grade matrix
+    results.append(measure("GradeParser.scan_dataframe (header)", lambda: lambda: grade_parser.scan_dataframe().head(2).collect()))
+    results.append(measure("GradeParser.parse_assignments", lambda: lambda: grade_parser.parse_assignments(header, max_points_row)))
+    results.append(measure("GradeParser.parse_info", lambda: grade_parser.parse_info))
+
+    matrix = grade_parser.get_grade_matrix()
+    assignments = grade_parser.get_raw_assignment_titles()
+    max_points = grade_parser.get_assignment_max_points()
+    status_matrix = grade_parser.get_status_matrix()
+
+    results.append(measure("Analyzer.__init__ (lazy)", lambda: lambda: Analyzer(matrix, assignments, max_points, lazy=True, status_matrix=status_matrix)))
+
+    # Each make_* step runs on a fresh lazy analyzer so earlier steps do not warm its caches
+    steps = ["rank_students", "make_basic_statistics", "make_grade_distribution"]
+    if include_figures:
+        steps += ["make_box_plots", "make_histograms", "make_score_plots"]
+
+    for step in steps:
+        def prepare(step=step):
+            return getattr(Analyzer(matrix, assignments, max_points, lazy=True, status_matrix=status_matrix), step)
+
+        results.append(measure(f"Analyzer.{step}", prepare))
+
+    return results
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Generates a synthetic gradebook (or uses an existing export) and prints the time and memory of each stage
+
+    Parameters:
+        argv (list[str] | None): The command-line arguments, defaults to sys.argv
+
+    Returns:
+        int: The exit code
+    """
+
+    parser = argparse.ArgumentParser(description="Benchmark parsing and analyzing a Canvas gradebook export.")
+    parser.add_argument("--students", type=int, default=3000, help="Number of students in the synthetic gradebook")
+    parser.add_argument("--assignments", type=int, default=200, help="Number of assignment columns in the synthetic gradebook")
+    parser.add_argument("--sections", type=int, default=10, help="Number of sections in the synthetic gradebook")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the synthetic gradebook")
+    parser.add_argument("--file", type=Path, default=None, help="Benchmark this export instead of a synthetic one")
+    parser.add_argument("--generate-only", type=Path, default=None, help="Only write the synthetic gradebook to this path")
+    parser.add_argument("--skip-figures", action="store_true", help="Do not time building the figures")
+    parser.add_argument("--imports", action="store_true", help="Only check each module's import time against its budget")
+    args = parser.parse_args(argv)
+
+    if args.imports:
+        results = [measure_import(module) for module in IMPORT_TIME_BUDGETS]
+        over_budget = [result for result in results if result["Seconds"] > result["Budget"] or result["Plotly Imported"]]
+
+        print(f"{'Module':<20}{'Seconds':>10}{'Budget':>10}{'Plotly Imported':>18}")
+        for result in results:
+            print(f"{result['Module']:<20}{result['Seconds']:>10.3f}{result['Budget']:>10.3f}{str(result['Plotly Imported']):>18}")
+
+        return 1 if over_budget else 0
+
+    if args.generate_only is not None:
+        generate_gradebook(args.generate_only, args.students, args.assignments, args.sections, args.seed)
+        return 0
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.file
+        if path is None:
+            path = Path(directory) / "gradebook.csv"
+            generate_gradebook(path, args.students, args.assignments, args.sections, args.seed)
+            print(f"Synthetic gradebook: {args.students} students, {args.assignments} assignments, {args.sections} sections")
+
+        print(f"File size: {path.stat().st_size / (1024 * 1024):,.2f} MB")
+        results = run_benchmark(path, include_figures=not args.skip_figures)
+
+    print(f"{'Stage':<36}{'Seconds':>10}{'RSS Peak Increase (MB)':>26}{'Python Peak (MB)':>20}")
+    for result in results:
+        print(f"{result['Stage']:<36}{result['Seconds']:>10.3f}{result['RSS Peak Increase (MB)']:>26.1f}{result['Python Peak (MB)']:>20.1f}")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+import argparse
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import polars as pl
+from analyzer import Analyzer
+from grade_parser import GradeParser, is_snapshot
+from longitudinal import CourseHistory
+from parse_cache import hash_file
+
+def write_frame(df: pl.DataFrame, path: Path, output_format: str) -> None:
+    """
+    Writes a DataFrame in the requested output format
+
+    Parameters:
+        df (pl.DataFrame): The DataFrame to write
+        path (Path): The output path without an extension
+        output_format (str): Either "parquet" or "csv"
+
+    Returns:
+        None
+    """
+
+    if output_format == "parquet":
+        df.write_parquet(path.with_suffix(".parquet"))
+    else:
+        df.write_csv(path.with_suffix(".csv"))
+
+def load_export(export_path: Path, snapshot_dir: Path | None) -> GradeParser:
+    """
+    Parses a Canvas export, reusing its snapshot if one was saved before
+
+    Parameters:
+        export_path (Path): The Canvas grade export CSV
+        snapshot_dir (Path | None): The folder holding snapshots keyed by file hash, if any
+
+    Returns:
+        GradeParser: The grade parser for the export
+    """
+
+    if snapshot_dir is None:
+        return GradeParser(export_path)
+
+    with open(export_path, "rb") as file_object:
+        snapshot_path = snapshot_dir / hash_file(file_object)
+
+    if is_snapshot(snapshot_path):
+        return GradeParser.from_snapshot(snapshot_path)
+
+    grade_parser = GradeParser(export_path)
+    grade_parser.save_snapshot(snapshot_path)
+
+    return grade_parser
+
+def analyze_export(export_path: Path, output_dir: Path, output_format: str, snapshot_dir: Path | None = None) -> tuple:
+    """
+    Parses and analyzes one Canvas export and writes its reports to a folder named after the export
+
+    Parameters:
+        export_path (Path): The Canvas grade export CSV
+        output_dir (Path): The folder to write the course folder into
+        output_format (str): Either "parquet" or "csv"
+        snapshot_dir (Path | None): The folder holding snapshots keyed by file hash, if any
+
+    Returns:
+        tuple: The export path, the number of students and the number of assignments
+    """
+
+    grade_parser = load_export(export_path, snapshot_dir)
+    assignments = grade_parser.get_raw_assignment_titles()
+
+    # Figures are never requested, so only the tables below are computed
+    analyzer = Analyzer(
+        grade_parser.get_grade_matrix(),
+        assignments,
+        grade_parser.get_assignment_max_points(),
+        lazy=True,
+        status_matrix=grade_parser.get_status_matrix()
+    )
+
+    course_dir = output_dir / export_path.stem
+    course_dir.mkdir(parents=True, exist_ok=True)
+
+    # Statistics are already one row per assignment (or per assignment and section)
+    write_frame(analyzer.get_statistics_summary(), course_dir / "statistics", output_format)
+    write_frame(analyzer.get_section_statistics_summary(), course_dir / "section_statistics", output_format)
+
+    # Views across all assignments, as percentages of each assignment's max points
+    write_frame(analyzer.get_student_averages(), course_dir / "student_averages", output_format)
+    write_frame(analyzer.get_section_means(), course_dir / "section_means", output_format)
+
+    # How the assignments relate to each other and how well each one separates students
+    write_frame(analyzer.get_correlation_matrix(), course_dir / "correlations", output_format)
+    write_frame(analyzer.get_item_analysis(), course_dir / "item_analysis", output_format)
+
+    # Grades that look like data-entry mistakes
+    write_frame(analyzer.get_anomalies(False), course_dir / "anomalies", output_format)
+
+    # Stack the per-assignment rankings and distributions into long tables
+    rankings = [
+        analyzer.get_assignment_rankings_by_assignment(assignment, False).with_columns(pl.lit(assignment).alias("Assignment"))
+        for assignment in assignments
+    ]
+    distributions = [
+        analyzer.get_grade_distributions()[assignment].with_columns(pl.lit(assignment).alias("Assignment"))
+        for assignment in assignments
+    ]
+
+    if rankings:
+        write_frame(pl.concat(rankings).select("Assignment", pl.exclude("Assignment")), course_dir / "rankings", output_format)
+        write_frame(pl.concat(distributions).select("Assignment", "Grade", "Count"), course_dir / "distributions", output_format)
+
+    return export_path, grade_parser.get_grade_matrix().height, len(assignments)
+
+def combine_exports(export_paths: list[Path], output_dir: Path, output_format: str, course: str, snapshot_dir: Path | None = None) -> None:
+    """
+    Compares several exports of the same course (e.g. one per term or per section) and writes the
+    statistics and distributions per export and across all of them to a "combined" folder
+
+    Parameters:
+        export_paths (list[Path]): The Canvas grade export CSVs, each labeled as a term by its file name
+        output_dir (Path): The folder to write the combined folder into
+        output_format (str): Either "parquet" or "csv"
+        course (str): The name of the course
+        snapshot_dir (Path | None): The folder holding snapshots keyed by file hash, if any
+
+    Returns:
+        None
+    """
+
+    history = CourseHistory()
+    for export_path in export_paths:
+        history.add_export(load_export(export_path, snapshot_dir), course, export_path.stem)
+
+    reports = {
+        "exports": history.get_export_summary_query(),
+        "statistics_by_export": history.get_statistics_query(per_export=True),
+        "statistics_overall": history.get_statistics_query(per_export=False),
+        "section_statistics_by_export": history.get_statistics_query(per_export=True, by_section=True),
+        "distributions_by_export": history.get_distribution_query(per_export=True),
+        "distributions_overall": history.get_distribution_query(per_export=False)
+    }
+
+    combined_dir = output_dir / "combined"
+    combined_dir.mkdir(parents=True, exist_ok=True)
+
+    # Every report starts from the same concatenated table, so they are collected together
+    for name, df in zip(reports, pl.collect_all(list(reports.values()))):
+        write_frame(df, combined_dir / name, output_format)
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Analyzes every Canvas export in a folder in parallel and writes the reports per course
+
+    Parameters:
+        argv (list[str] | None): The command-line arguments, defaults to sys.argv
+
+    Returns:
+        int: The exit code
+    """
+
+    parser = argparse.ArgumentParser(description="Analyze a folder of Canvas \"Export Entire Gradebook\" CSV files without the UI.")
+    parser.add_argument("export_dir", type=Path, help="Folder containing the Canvas grade export CSV files")
+    parser.add_argument("output_dir", type=Path, help="Folder to write one report folder per export into")
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet", dest="output_format", help="Output file format (default: parquet)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of exports to analyze at the same time (default: number of CPUs)")
+    parser.add_argument("--snapshot-dir", type=Path, default=None, help="Folder to save parsed gradebooks in and reload unchanged exports from")
+    parser.add_argument("--combine", action="store_true", help="Also compare the exports as terms or sections of one course, written to a \"combined\" folder")
+    parser.add_argument("--course", default=None, help="Course name used with --combine (default: the export folder name)")
+    args = parser.parse_args(argv)
+
+    export_paths = sorted(args.export_dir.glob("*.csv"))
+    if not export_paths:
+        print(f"No CSV files found in {args.export_dir}", file=sys.stderr)
+        return 1
+
+    failures = 0
+    analyzed_paths = []
+
+    # Polars is multithreaded, so workers are spawned rather than forked
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = {executor.submit(analyze_export, path, args.output_dir, args.output_format, args.snapshot_dir): path for path in export_paths}
+
+        for future in as_completed(futures):
+            try:
+                export_path, student_count, assignment_count = future.result()
+                analyzed_paths.append(export_path)
+                print(f"{export_path.name}: {student_count} students, {assignment_count} assignments")
+            except Exception as e:
+                failures += 1
+                print(f"{futures[future].name}: failed ({e})", file=sys.stderr)
+
+    # Exports are reloaded here, from their snapshots if --snapshot-dir was given
+    if args.combine and analyzed_paths:
+        try:
+            combine_exports(sorted(analyzed_paths), args.output_dir, args.output_format, args.course or args.export_dir.resolve().name, args.snapshot_dir)
+            print(f"combined: {len(analyzed_paths)} exports")
+        except Exception as e:
+            failures += 1
+            print(f"combined: failed ({e})", file=sys.stderr)
+
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
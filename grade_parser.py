@@ -1,14 +1,47 @@
 import polars as pl
-from io import StringIO
-from student import Student
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from instrumentation import StageTimings
+from student import GradeStore, Student
+
+# File names inside a parsed gradebook snapshot folder
+SNAPSHOT_GRADES_FILE = "grades.arrow"
+SNAPSHOT_COLUMNS_FILE = "columns.arrow"
+SNAPSHOT_STATUS_FILE = "status.arrow"
+
+# Course-wide score columns Canvas adds after the assignment group scores
+FINAL_SCORE_COLUMNS = [
+    "Current Points", "Final Points", "Unposted Current Points", "Unposted Final Points",
+    "Current Score", "Unposted Current Score", "Final Score", "Unposted Final Score",
+    "Current Grade", "Unposted Current Grade", "Final Grade", "Unposted Final Grade",
+    "Override Score", "Override Grade"
+]
+
+def is_snapshot(snapshot_path) -> bool:
+    """
+    Checks if a folder holds a complete snapshot saved with GradeParser.save_snapshot
+
+    Parameters:
+        snapshot_path: Path to the snapshot folder
+
+    Returns:
+        bool: True if the snapshot can be loaded with GradeParser.from_snapshot, False otherwise
+    """
+    snapshot_path = Path(snapshot_path)
+
+    # The grade states are optional, snapshots saved before they were kept do not have them
+    return (snapshot_path / SNAPSHOT_GRADES_FILE).is_file() and (snapshot_path / SNAPSHOT_COLUMNS_FILE).is_file()
 
 class GradeParser:
-    def __init__(self, file_object) -> None:
+    def __init__(self, file_object, timings: StageTimings | None = None) -> None:
         """
         Initializes the grade file parser given an uploaded file object
 
         Parameters:
-            file_object: Uploaded file object (e.g., from Streamlit file_uploader)
+            file_object: Uploaded file object (e.g., from Streamlit file_uploader) or a path to the file
+            timings (StageTimings | None): Where to record the time spent in each parsing stage
 
         Returns:
             None
@@ -17,11 +50,85 @@ class GradeParser:
         self.assignments = []
         self.assignment_titles = []
         self.assignment_max_points = []
+        self.column_metadata = None  # One row per CSV column with its kind, Canvas assignment ID and max points
         self.student_data = []
-        self.df = None  # Store the Polars DataFrame
+        self.grade_matrix = None  # One row per student, one Float64 column per assignment
+        self.status_matrix = None  # One row per student, the Canvas state of each grade that is not a number (EX, incomplete, etc.)
+        self.timings = timings if timings is not None else StageTimings()
         
         self.parse_info()
 
+    @classmethod
+    def from_snapshot(cls, snapshot_path) -> "GradeParser":
+        """
+        Creates a grade parser from a snapshot saved with save_snapshot, without re-parsing the CSV.
+        The snapshot files are memory mapped, so loading is nearly instant.
+
+        Parameters:
+            snapshot_path: Path to the snapshot folder
+
+        Returns:
+            GradeParser: The grade parser with the saved results
+        """
+        snapshot_path = Path(snapshot_path)
+
+        grade_parser = cls.__new__(cls)
+        grade_parser.file_object = snapshot_path
+        grade_parser.student_data = []
+        grade_parser.timings = StageTimings()
+
+        with grade_parser.timings.stage("snapshot load"):
+            grade_parser.grade_matrix = pl.read_ipc(snapshot_path / SNAPSHOT_GRADES_FILE, memory_map=True)
+            grade_parser.column_metadata = pl.read_ipc(snapshot_path / SNAPSHOT_COLUMNS_FILE, memory_map=True)
+
+            # Snapshots saved before grade states were kept do not have them
+            status_path = snapshot_path / SNAPSHOT_STATUS_FILE
+            grade_parser.status_matrix = pl.read_ipc(status_path, memory_map=True) if status_path.is_file() else None
+
+        grade_parser.set_assignments_from_metadata()
+
+        if grade_parser.status_matrix is None:
+            grade_parser.status_matrix = grade_parser.grade_matrix.select(
+                "ID", *[pl.lit(None, dtype=pl.Utf8).alias(assignment) for assignment in grade_parser.assignments]
+            )
+
+        return grade_parser
+
+    def save_snapshot(self, snapshot_path) -> None:
+        """
+        Saves the parsed results (grade matrix, student information, grade states and column metadata with
+        the assignment titles and max points) as Arrow IPC files that can be loaded back with from_snapshot.
+        The files are written to a temporary folder that is then renamed into place, so the snapshot folder
+        only ever exists complete, even if another process saves the same snapshot or the save is interrupted.
+
+        Parameters:
+            snapshot_path: Path to the snapshot folder, its parent is created if needed
+
+        Returns:
+            None
+        """
+        snapshot_path = Path(snapshot_path)
+        snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+
+        temporary_path = Path(tempfile.mkdtemp(prefix=f".{snapshot_path.name}.", suffix=".tmp", dir=snapshot_path.parent))
+
+        try:
+            for df, file_name in [(self.grade_matrix, SNAPSHOT_GRADES_FILE), (self.column_metadata, SNAPSHOT_COLUMNS_FILE), (self.status_matrix, SNAPSHOT_STATUS_FILE)]:
+                df.write_ipc(temporary_path / file_name, compression="uncompressed")
+
+            try:
+                os.replace(temporary_path, snapshot_path)
+            except OSError:
+                # Another process saved the same snapshot first, so keep theirs
+                if is_snapshot(snapshot_path):
+                    return
+
+                # A folder left incomplete by an older version is replaced
+                shutil.rmtree(snapshot_path, ignore_errors=True)
+                os.replace(temporary_path, snapshot_path)
+        finally:
+            shutil.rmtree(temporary_path, ignore_errors=True)
+
     def is_actual_grade(self, grade: str) -> bool:
         """
         Checks if the grade is a valid grade
@@ -40,34 +147,30 @@ class GradeParser:
         except ValueError:
             return False
 
-    def load_dataframe(self) -> pl.DataFrame:
+    def scan_dataframe(self) -> pl.LazyFrame:
         """
-        Load the CSV data into a Polars DataFrame from file object
+        Scans the CSV data lazily from the file object or file path, with every column read as a string.
+        Nothing is read until the scan is collected, and then only the columns the query uses are parsed.
 
         Parameters:
             None
-        
+
         Returns:
-            pl.DataFrame: The loaded DataFrame
+            pl.LazyFrame: The scanned CSV data
         """
-        # Reset file pointer and read content
-        self.file_object.seek(0)
-        content = self.file_object.read()
-        
-        # Convert bytes to string if needed
-        if isinstance(content, bytes):
-            content = content.decode('utf-8')
+        source = self.file_object
 
-        # Remove the last row (it's a test row)
-        lines = content.strip().split("\n")[:-1]
-        content = "\n".join(lines)
-        
-        # Use StringIO to create a file-like object for Polars
-        return pl.read_csv(StringIO(content))
+        # Reset the file pointer of uploaded file objects
+        if not isinstance(source, (str, os.PathLike)):
+            source.seek(0)
+
+        return pl.scan_csv(source, infer_schema=False)
 
     def parse_info(self) -> None:
         """
-        Parses the grade file to extract the student data and grades
+        Parses the grade file to extract the student data and grades. The header rows are read first,
+        then the grade matrix is built in a single query over the scanned CSV that skips the columns
+        it does not need (e.g. the score columns).
 
         Parameters:
             None
@@ -75,93 +178,148 @@ class GradeParser:
         Returns:
             None
         """
-        # Load the DataFrame
-        self.df = self.load_dataframe()
-        
-        # Get column names and the row after with the max points available
-        header = self.df.columns
+        # Scan the CSV and read its header rows
+        with self.timings.stage("load"):
+            scan = self.scan_dataframe()
+            header = scan.collect_schema().names()
+
+            if "Student" not in header:
+                raise ValueError("The grade file has no Student column")
+
+            header_rows = scan.head(2).collect()
+
+        with self.timings.stage("header parse"):
+            # Find the row that starts with "Points Possible", it holds the max points available
+            max_points_row = header_rows.filter(pl.col("Student").str.contains("Points Possible")).row(0)
+            self.parse_assignments(header, max_points_row)
+
+        with self.timings.stage("student extraction"):
+            # Skip the two header rows and the last row (it's a test row), then the empty rows
+            row = pl.int_range(pl.len())
+            student_rows = scan.filter((row >= 2) & (row < pl.len() - 1)).filter(pl.col("Student").str.strip_chars() != "")
+
+            # Split "Last, First" into its parts in one pass
+            name_parts = pl.col("Student").str.splitn(", ", 2)
+            last_name = name_parts.struct.field("field_0")
+            first_name = name_parts.struct.field("field_1")
+
+            # Build the grade matrix. Grades that are not numbers (missing, EX, etc.) become nulls,
+            # and the status matrix keeps what those cells said, apart from blanks
+            cells = [pl.col(assignment).str.strip_chars() for assignment in self.assignments]
+            grades = [cell.cast(pl.Float64, strict=False) for cell in cells]
+
+            # Both matrices come from the same scan, so they are collected together
+            self.grade_matrix, self.status_matrix = pl.collect_all([student_rows.select(
+                pl.col("ID"),
+                first_name.fill_null("").alias("First Name"),
+                last_name.alias("Last Name"),
+                pl.when(first_name.is_null())
+                    .then(last_name)
+                    .otherwise(pl.concat_str([first_name, last_name], separator=" "))
+                    .alias("Name"),
+                pl.col("Section"),
+                *grades
+            ), student_rows.select(
+                pl.col("ID"),
+                *[pl.when(grade.is_null() & (cell != "")).then(cell).alias(assignment) for assignment, cell, grade in zip(self.assignments, cells, grades)]
+            )])
 
-        # Find the row that starts with "Points Possible"
-        max_points_row = self.df.filter(pl.col("Student").str.contains("Points Possible")).row(0)
-        self.parse_assignments(header, max_points_row)
+    def parse_assignments(self, header: list, max_points_row: list) -> None:
+        """
+        Using the header row, extract the relevant assignment column names, their clean titles and max points
 
-        # Extract the student data
-        student_rows = self.df.slice(2)
-        
-        # Process each student row
-        for row in student_rows.iter_rows(named=True):
-            # Extract the student's identifying information
-            if not row.get("Student") or row["Student"].strip() == "":
-                continue  # Skip empty rows
-
-            last_name, first_name = row["Student"].split(", ")
-            student_id = row["ID"]
-            section = row["Section"]
-            
-            # Create a student profile
-            student = Student(first_name, last_name, student_id, section)
-            
-            # Extract the student's grades
-            for assignment in self.assignments:
-                grade = row.get(assignment, "")
-                student.add_grade(assignment, grade)
-            
-            self.student_data.append(student)
+        Parameters:
+            header (list): The header row (column names) of the CSV file
+            max_points_row (list): The row after the header row with the max points available
 
-    def parse_assignments(self, header: list, max_points_row: list) -> None:
+        Returns:
+            None
         """
-        Using the header row, extract the relevant assignment column names
+
+        self.column_metadata = self.classify_columns(header, max_points_row)
+        self.set_assignments_from_metadata()
+
+    def classify_columns(self, header: list, max_points_row: list) -> pl.DataFrame:
+        """
+        Tags every column of the CSV file in a single pass over the header. Each column is one of:
+            identity: Student information up to and including the Section column
+            assignment: A column with a numeric Points Possible value
+            read only: Any other column before the score columns (e.g. notes or ungraded columns)
+            category score: The assignment group scores (Current Score, Unposted Current Score, ... per group)
+            final score: The course-wide scores and grades
 
         Parameters:
             header (list): The header row (column names) of the CSV file
             max_points_row (list): The row after the header row with the max points available
 
+        Returns:
+            pl.DataFrame: One row per column with its position, name, kind, clean title, Canvas assignment ID and max points
+        """
+
+        if "Section" not in header:
+            raise ValueError("The grade file has no Section column")
+
+        column = pl.col("Column")
+        position = pl.col("Position")
+
+        # The score columns start at the first "<Group> Current Score" followed by its "Unposted Current Score",
+        # or at the course-wide "Current Score" if there are no groups
+        is_score_start = (column.str.ends_with("Current Score") & column.shift(-1).str.ends_with("Unposted Current Score")) | (column == "Current Score")
+        section_position = pl.when(column == "Section").then(position).min()
+        score_position = pl.when(is_score_start).then(position).min().fill_null(len(header))
+
+        columns = pl.DataFrame(
+            {"Column": header, "Points Possible": [None if value is None else str(value) for value in max_points_row]},
+            schema={"Column": pl.Utf8, "Points Possible": pl.Utf8}
+        ).with_row_index("Position")
+
+        return columns.with_columns(
+            pl.col("Points Possible").str.strip_chars().cast(pl.Float64, strict=False).alias("Max Points"),
+            column.str.extract(r"\((\d+)\)$", 1).cast(pl.Int64, strict=False).alias("Assignment ID"),
+            column.str.replace(r"\s*\(\d+\)$", "").alias("Title")
+        ).with_columns(
+            pl.when(position <= section_position).then(pl.lit("identity"))
+                .when(column.is_in(FINAL_SCORE_COLUMNS) & (position >= score_position)).then(pl.lit("final score"))
+                .when(position >= score_position).then(pl.lit("category score"))
+                .when(pl.col("Max Points").is_not_null()).then(pl.lit("assignment"))
+                .otherwise(pl.lit("read only"))
+                .alias("Kind")
+        ).select("Position", "Column", "Kind", "Title", "Assignment ID", "Max Points")
+
+    def set_assignments_from_metadata(self) -> None:
+        """
+        Fills the assignment column names, clean titles and max points from the column metadata
+
+        Parameters:
+            None
+
         Returns:
             None
         """
 
-        start_index = header.index("Section") + 1
-        end_index = header.index("Current Score")
-        
-        self.assignments = header[start_index:end_index]
-        print("--------------------------------")
-        print(self.assignments)
-        
-        # Ignore categorical columns (Current Score, Unposted Current Score pairs)
-        filtered_assignments = []
-        for index in range(len(self.assignments)-1):
-            current_assignment = self.assignments[index]
-            
-            # Check if this is a Current Score column followed by Unposted Current Score
-            if (current_assignment.endswith("Current Score") and 
-                index + 1 < len(self.assignments) and 
-                self.assignments[index + 1].endswith("Unposted Current Score")):
-                # Stop here - we've hit the grade summary columns
-                break
-            
-            filtered_assignments.append(current_assignment)
-        
-        self.assignments = filtered_assignments
-        print(self.assignments)
-        assignments_with_max_points = []
+        assignment_columns = self.column_metadata.filter(pl.col("Kind") == "assignment")
+
+        self.assignments = assignment_columns["Column"].to_list()
+        self.assignment_titles = assignment_columns["Title"].to_list()
+        self.assignment_max_points = assignment_columns["Max Points"].to_list()
+
+    def get_column_metadata(self) -> pl.DataFrame:
+        """
+        Returns the classification of every CSV column: its position, name, kind (identity, assignment,
+        read only, category score or final score), clean title, Canvas assignment ID and max points
 
-        # Now remove all the columns that don't have a max score
-        for index, assignment in enumerate(self.assignments):
-            true_max_points_index = index + start_index
-            print(index, assignment, max_points_row[true_max_points_index])
-            if max_points_row[true_max_points_index] is not None and self.is_actual_grade(max_points_row[true_max_points_index]):
-                assignments_with_max_points.append(assignment)
-                print("Added")
+        Parameters:
+            None
 
-        self.assignments = assignments_with_max_points
-        print(self.assignments)
+        Returns:
+            pl.DataFrame: The column metadata
+        """
 
-        # Remove the assignment IDs to get clean titles
-        self.assignment_titles = [" ".join(assignment.split(" ")[:-1]) for assignment in self.assignments]
+        return self.column_metadata.clone()
 
     def get_student_data(self) -> list:
         """
-        Returns the list of student data
+        Returns the list of student data, built from the grade matrix on first request
 
         Parameters:
             None
@@ -170,8 +328,60 @@ class GradeParser:
             list: The list of student data
         """
 
+        if not self.student_data:
+            # Every student is a view onto one row of a shared grade store
+            store = GradeStore.from_columns(self.assignments, [self.grade_matrix[assignment].to_list() for assignment in self.assignments])
+            identity = self.grade_matrix.select("First Name", "Last Name", "ID", "Section")
+
+            self.student_data = [
+                Student(first_name, last_name, student_id, section, store, row)
+                for row, (first_name, last_name, student_id, section) in enumerate(identity.iter_rows())
+            ]
+
         return self.student_data.copy()
+
+    def get_timings(self) -> StageTimings:
+        """
+        Returns the time and memory recorded for each parsing stage
+
+        Parameters:
+            None
+
+        Returns:
+            StageTimings: The stage timings
+        """
+
+        return self.timings
+
+    def get_grade_matrix(self) -> pl.DataFrame:
+        """
+        Returns the grade matrix: the student ID, names and section followed by one
+        Float64 column per assignment, with nulls for missing or non-numeric grades
+
+        Parameters:
+            None
+
+        Returns:
+            pl.DataFrame: The grade matrix
+        """
+
+        return self.grade_matrix.clone()
     
+    def get_status_matrix(self) -> pl.DataFrame:
+        """
+        Returns the status matrix: the student ID followed by one string column per assignment with what
+        Canvas showed for each grade that is not a number (e.g. EX, incomplete or a letter grade), and nulls
+        for numeric or blank grades
+
+        Parameters:
+            None
+
+        Returns:
+            pl.DataFrame: The status matrix
+        """
+
+        return self.status_matrix.clone()
+
     def get_raw_assignment_titles(self) -> list:
         """
         Returns the list of assignment titles
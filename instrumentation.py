@@ -0,0 +1,177 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import polars as pl
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+LOGGER_NAME = "canvas_grade_analyzer"
+
+def get_memory_usage() -> int | None:
+    """
+    Returns the current resident memory of the process in bytes, or its peak if the current value is not available
+
+    Parameters:
+        None
+
+    Returns:
+        int | None: The memory in bytes, or None if it cannot be measured on this platform
+    """
+
+    # /proc/self/statm holds the resident size in pages on Linux
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    if resource is not None:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    return None
+
+def get_logger() -> logging.Logger:
+    """
+    Returns the logger used for the per-upload timing lines, writing to stderr at the INFO level
+
+    Parameters:
+        None
+
+    Returns:
+        logging.Logger: The logger
+    """
+
+    logger = logging.getLogger(LOGGER_NAME)
+
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+    return logger
+
+class StageTimings:
+    def __init__(self) -> None:
+        """
+        Initializes an empty set of stage timings. Stages that run more than once (e.g. ranking
+        each assignment on request) are added up under the same name.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+
+        self.stages = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Times the code inside the with block and records its wall time and change in resident memory
+
+        Parameters:
+            name (str): The name of the stage
+
+        Returns:
+            None
+        """
+
+        memory_before = get_memory_usage()
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            memory_after = get_memory_usage()
+            memory_change = memory_after - memory_before if memory_before is not None and memory_after is not None else 0
+
+            with self.lock:
+                if name not in self.stages:
+                    self.stages[name] = {"Stage": name, "Seconds": 0.0, "Calls": 0, "Memory Change (MB)": 0.0}
+
+                self.stages[name]["Seconds"] += seconds
+                self.stages[name]["Calls"] += 1
+                self.stages[name]["Memory Change (MB)"] += memory_change / (1024 * 1024)
+
+    def get_stages(self) -> list[dict]:
+        """
+        Returns the recorded stages in the order they first ran
+
+        Parameters:
+            None
+
+        Returns:
+            list[dict]: One entry per stage with its name, total seconds, number of calls and memory change
+        """
+
+        with self.lock:
+            return [stage.copy() for stage in self.stages.values()]
+
+    def get_total_seconds(self) -> float:
+        """
+        Returns the total time recorded over every stage
+
+        Parameters:
+            None
+
+        Returns:
+            float: The total seconds
+        """
+
+        return sum(stage["Seconds"] for stage in self.get_stages())
+
+    def to_dataframe(self) -> pl.DataFrame:
+        """
+        Returns the recorded stages as a DataFrame
+
+        Parameters:
+            None
+
+        Returns:
+            pl.DataFrame: One row per stage
+        """
+
+        return pl.DataFrame(
+            self.get_stages(),
+            schema={"Stage": pl.Utf8, "Seconds": pl.Float64, "Calls": pl.Int64, "Memory Change (MB)": pl.Float64}
+        )
+
+    def to_json(self, **fields) -> str:
+        """
+        Returns the recorded stages as a single JSON line
+
+        Parameters:
+            **fields: Extra fields to include (e.g. the file hash or the number of students)
+
+        Returns:
+            str: The JSON line
+        """
+
+        stages = {stage["Stage"]: {"seconds": round(stage["Seconds"], 6), "calls": stage["Calls"], "memory_change_mb": round(stage["Memory Change (MB)"], 3)} for stage in self.get_stages()}
+
+        return json.dumps({**fields, "total_seconds": round(self.get_total_seconds(), 6), "stages": stages})
+
+    def log(self, **fields) -> None:
+        """
+        Writes the recorded stages as a JSON line to the canvas_grade_analyzer logger
+
+        Parameters:
+            **fields: Extra fields to include (e.g. the file hash or the number of students)
+
+        Returns:
+            None
+        """
+
+        get_logger().info(self.to_json(**fields))
@@ -0,0 +1,183 @@
+import polars as pl
+from analyzer import get_statistics_expressions
+from grade_parser import GradeParser
+
+class CourseHistory:
+    def __init__(self) -> None:
+        """
+        Initializes an empty history of grade exports, e.g. several sections or several terms of the same course.
+        Every export is kept as a lazily evaluated long table (one row per student and assignment), so comparing
+        many exports only runs the aggregations that are asked for and never builds any per-assignment figures.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+
+        self.grades = []
+        self.student_ids = {}
+
+    def add_export(self, grade_parser: GradeParser, course: str, term: str) -> None:
+        """
+        Adds a parsed export to the history. Assignments are matched across exports by their title without the
+        Canvas assignment ID, since the same assignment gets a new ID every term.
+
+        Parameters:
+            grade_parser (GradeParser): The parsed export
+            course (str): The name of the course
+            term (str): The term of the export (e.g. "Fall 2024")
+
+        Returns:
+            None
+        """
+
+        # Several files of the same course and term (e.g. one per section) must not list a student twice
+        grade_matrix = grade_parser.get_grade_matrix()
+        student_ids = set(grade_matrix["ID"].to_list())
+        previous_ids = self.student_ids.setdefault((course, term), set())
+
+        if len(student_ids) != grade_matrix.height or not previous_ids.isdisjoint(student_ids):
+            raise ValueError(f"{course} ({term}) lists the same student ID more than once")
+
+        previous_ids.update(student_ids)
+
+        assignment_columns = grade_parser.get_column_metadata().filter(pl.col("Kind") == "assignment").select(
+            "Column",
+            pl.col("Title").alias("Assignment"),
+            "Max Points"
+        )
+
+        # One row per (student, assignment), with the grade also as a percentage of the max points
+        self.grades.append(
+            grade_matrix.lazy().unpivot(
+                index=["ID", "Name", "Section"],
+                on=assignment_columns["Column"].to_list(),
+                variable_name="Column",
+                value_name="Grade"
+            ).join(assignment_columns.lazy(), on="Column", how="left", maintain_order="left").select(
+                pl.lit(course).alias("Course"),
+                pl.lit(term).alias("Term"),
+                "ID", "Name", "Section", "Assignment", "Max Points",
+                pl.col("Grade").cast(pl.Float64),
+                pl.when(pl.col("Max Points") > 0).then(pl.col("Grade") / pl.col("Max Points") * 100).alias("Percentage")
+            )
+        )
+
+    def get_grades(self) -> pl.LazyFrame:
+        """
+        Returns every export as one lazily evaluated table keyed by course, term and student ID
+
+        Parameters:
+            None
+
+        Returns:
+            pl.LazyFrame: The Course, Term, ID, Name, Section, Assignment, Max Points, Grade and Percentage columns
+        """
+
+        if not self.grades:
+            raise ValueError("No exports have been added")
+
+        return pl.concat(self.grades, how="vertical_relaxed")
+
+    def get_statistics_query(self, per_export: bool = True, by_section: bool = False, percentages: bool = True) -> pl.LazyFrame:
+        """
+        Returns the query for the basic statistics of every assignment, per export or across all exports of a course
+
+        Parameters:
+            per_export (bool): Whether to keep each course and term apart instead of pooling every term of a course
+            by_section (bool): Whether to also split the statistics by section
+            percentages (bool): Whether to use percentages of the max points instead of points, so terms with
+            different max points can be compared
+
+        Returns:
+            pl.LazyFrame: One row per group with its mean, median, standard deviation, minimum, maximum, quartiles, count and missing
+        """
+
+        keys = ["Course", "Term", "Assignment"] if per_export else ["Course", "Assignment"]
+        if by_section:
+            keys.append("Section")
+
+        return self.get_grades().group_by(keys, maintain_order=True).agg(
+            get_statistics_expressions("Percentage" if percentages else "Grade")
+        ).sort(keys, maintain_order=True)
+
+    def get_distribution_query(self, per_export: bool = True, percentages: bool = False) -> pl.LazyFrame:
+        """
+        Returns the query for the number of students with each grade of every assignment, per export or across all exports of a course
+
+        Parameters:
+            per_export (bool): Whether to keep each course and term apart instead of pooling every term of a course
+            percentages (bool): Whether to count percentages of the max points instead of points
+
+        Returns:
+            pl.LazyFrame: One row per group and grade with its count
+        """
+
+        keys = ["Course", "Term", "Assignment"] if per_export else ["Course", "Assignment"]
+        grade = "Percentage" if percentages else "Grade"
+
+        return self.get_grades().drop_nulls(grade).group_by(*keys, grade, maintain_order=True).agg(
+            pl.len().alias("Count")
+        ).sort(*keys, grade, maintain_order=True)
+
+    def get_export_summary_query(self) -> pl.LazyFrame:
+        """
+        Returns the query for one row per export with its number of students and assignments and its mean percentage
+
+        Parameters:
+            None
+
+        Returns:
+            pl.LazyFrame: The Course, Term, Students, Sections, Assignments and Mean (%) columns
+        """
+
+        return self.get_grades().group_by("Course", "Term", maintain_order=True).agg(
+            pl.col("ID").n_unique().alias("Students"),
+            pl.col("Section").n_unique().alias("Sections"),
+            pl.col("Assignment").n_unique().alias("Assignments"),
+            pl.col("Percentage").mean().alias("Mean (%)")
+        )
+
+    def get_statistics(self, per_export: bool = True, by_section: bool = False, percentages: bool = True) -> pl.DataFrame:
+        """
+        Returns the basic statistics of every assignment, per export or across all exports of a course
+
+        Parameters:
+            per_export (bool): Whether to keep each course and term apart instead of pooling every term of a course
+            by_section (bool): Whether to also split the statistics by section
+            percentages (bool): Whether to use percentages of the max points instead of points
+
+        Returns:
+            pl.DataFrame: One row per group with its basic statistics
+        """
+
+        return self.get_statistics_query(per_export, by_section, percentages).collect()
+
+    def get_distributions(self, per_export: bool = True, percentages: bool = False) -> pl.DataFrame:
+        """
+        Returns the number of students with each grade of every assignment, per export or across all exports of a course
+
+        Parameters:
+            per_export (bool): Whether to keep each course and term apart instead of pooling every term of a course
+            percentages (bool): Whether to count percentages of the max points instead of points
+
+        Returns:
+            pl.DataFrame: One row per group and grade with its count
+        """
+
+        return self.get_distribution_query(per_export, percentages).collect()
+
+    def get_export_summary(self) -> pl.DataFrame:
+        """
+        Returns one row per export with its number of students, sections and assignments and its mean percentage
+
+        Parameters:
+            None
+
+        Returns:
+            pl.DataFrame: The export summary
+        """
+
+        return self.get_export_summary_query().collect()
@@ -1,6 +1,9 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
-from analyzer import Analyzer
-from grade_parser import GradeParser
+from analyzer import Analyzer, warm_up
+from grade_parser import GradeParser, is_snapshot
+from parse_cache import ParseCache, hash_file
 import polars as pl
 
 
@@ -10,6 +13,224 @@ st.set_page_config(page_title="Canvas Grade Analyzer", layout="wide")
 st.title("Canvas Grade Analyzer")
 st.write("This requires a Canvas grade report file to work. You can download one by going to the course's Grades tab and clicking \"Export\" and then selecting \"Export Entire Gradebook\".")
 
+# Optional folder for parsed gradebook snapshots, so files analyzed before reload without re-parsing
+SNAPSHOT_DIR = os.environ.get("CANVAS_ANALYZER_SNAPSHOT_DIR")
+
+# Number of uploaded files whose assignments are computed in the background at the same time
+PRECOMPUTE_WORKERS = int(os.environ.get("CANVAS_ANALYZER_PRECOMPUTE_WORKERS", "2"))
+
+# Page sizes offered for the ranking tables
+RANKING_PAGE_SIZES = [25, 50, 100, 250]
+
+# Whether to import Plotly and run the analysis once on a tiny gradebook in the background when the server starts
+WARM_UP = os.environ.get("CANVAS_ANALYZER_WARM_UP", "") not in ("", "0", "false")
+
+@st.cache_resource
+def get_parse_cache() -> ParseCache:
+    """
+    Returns the parse cache shared by every session on this server
+
+    Parameters:
+        None
+
+    Returns:
+        ParseCache: The shared parse cache
+    """
+
+    return ParseCache()
+
+@st.cache_resource
+def get_precompute_executor() -> ThreadPoolExecutor:
+    """
+    Returns the thread pool shared by every session on this server that computes the
+    remaining assignments of an uploaded file in the background
+
+    Parameters:
+        None
+
+    Returns:
+        ThreadPoolExecutor: The shared thread pool
+    """
+
+    return ThreadPoolExecutor(max_workers=PRECOMPUTE_WORKERS, thread_name_prefix="precompute")
+
+@st.fragment(run_every=1)
+def show_precompute_progress(analyzer: Analyzer) -> None:
+    """
+    Shows how many assignments have been computed in the background, refreshing on its own until all are done.
+    Once they are, the whole page is rerun once, so the fragment stops refreshing.
+
+    Parameters:
+        analyzer (Analyzer): The analyzer being precomputed
+
+    Returns:
+        None
+    """
+
+    if analyzer.precompute_future.done():
+        st.rerun()
+
+    done, total = analyzer.get_precompute_progress()
+    if total and done < total:
+        st.progress(done / total, text=f"Preparing assignments in the background: {done} of {total}")
+
+@st.cache_resource
+def start_warm_up():
+    """
+    Starts warm_up in the background once per server, so the upload page is not held up by it
+
+    Parameters:
+        None
+
+    Returns:
+        concurrent.futures.Future: The running or finished warm-up
+    """
+
+    return get_precompute_executor().submit(warm_up)
+
+def show_paged_table(analyzer: Analyzer, anonymize: bool, sort_options: list[str], sort_columns: dict, get_page, key: str) -> None:
+    """
+    Shows one page of a table with one row per student, with search, section, sort and page controls.
+    The filtering and paging happen in the analyzer, so only the visible page is sent to the browser.
+
+    Parameters:
+        analyzer (Analyzer): The analyzer of the uploaded file
+        anonymize (bool): Whether to anonymize the names
+        sort_options (list[str]): The sort choices, the first being the table's own order
+        sort_columns (dict): The column and direction (True for highest first) to sort by for each choice other than the first
+        get_page: Callable taking the search, sections, sort column, direction, page and page size and returning the page and the number of matches
+        key (str): Prefix for the widget keys, so several tables can be shown at once
+
+    Returns:
+        None
+    """
+
+    # Any change to what is shown starts again from the first page
+    def reset_page():
+        st.session_state[f"{key}_page"] = 1
+
+    search_col, section_col, sort_col, size_col = st.columns([3, 3, 2, 1])
+    search = search_col.text_input("Search", key=f"{key}_search", placeholder="Pseudonym" if anonymize else "Name or ID", on_change=reset_page)
+    sections = section_col.multiselect("Sections", analyzer.get_sections(), key=f"{key}_sections", on_change=reset_page)
+    sort_by = sort_col.selectbox("Sort by", sort_options, key=f"{key}_sort", on_change=reset_page)
+    page_size = size_col.selectbox("Rows", RANKING_PAGE_SIZES, index=1, key=f"{key}_page_size", on_change=reset_page)
+
+    column, descending = sort_columns.get(sort_by, (None, False))
+
+    page = st.session_state.get(f"{key}_page", 1)
+    rows, total = get_page(search, sections, column, descending, page, page_size)
+
+    # A narrower search can leave fewer pages than the page being shown, so go to the last one
+    page_count = max((total + page_size - 1) // page_size, 1)
+    if page > page_count:
+        page = page_count
+        st.session_state[f"{key}_page"] = page
+        rows, total = get_page(search, sections, column, descending, page, page_size)
+
+    st.dataframe(rows, hide_index=True)
+    # The page lives in the widget's session state, which the clamping above may have set
+    st.number_input(f"Page (of {page_count}, {total:,} students)", min_value=1, max_value=page_count, key=f"{key}_page")
+
+def show_ranking_table(analyzer: Analyzer, assignment: str, anonymize: bool, graded: bool, key: str) -> None:
+    """
+    Shows one page of an assignment's rankings with search, section, sort and page controls
+
+    Parameters:
+        analyzer (Analyzer): The analyzer of the uploaded file
+        assignment (str): The raw assignment title
+        anonymize (bool): Whether to anonymize the names
+        graded (bool): Whether to show the students with a grade or those without one
+        key (str): Prefix for the widget keys, so several tables can be shown at once
+
+    Returns:
+        None
+    """
+
+    # Rank and file order are the order of the rankings themselves, and grades read best from the top
+    sort_options = ["Rank", "Name", "Grade"] if graded else ["File order", "Name"]
+    sort_columns = {"Name": ("Name", False), "Grade": ("Grade", True)}
+    if not anonymize:
+        sort_options.append("Section")
+        sort_columns["Section"] = ("Section", False)
+
+    show_paged_table(
+        analyzer, anonymize, sort_options, sort_columns,
+        lambda *args: analyzer.get_ranking_page(assignment, anonymize, graded, *args),
+        key
+    )
+
+def show_student_averages_table(analyzer: Analyzer, anonymize: bool, key: str) -> None:
+    """
+    Shows one page of the student averages with search, section, sort and page controls
+
+    Parameters:
+        analyzer (Analyzer): The analyzer of the uploaded file
+        anonymize (bool): Whether to anonymize the names
+        key (str): Prefix for the widget keys, so several tables can be shown at once
+
+    Returns:
+        None
+    """
+
+    # The averages are already ordered from highest to lowest
+    sort_columns = {"Name": ("Name", False), "Section": ("Section", False), "Graded Assignments": ("Graded Assignments", True)}
+
+    show_paged_table(
+        analyzer, anonymize, ["Average", *sort_columns], sort_columns,
+        lambda *args: analyzer.get_student_average_page(anonymize, *args),
+        key
+    )
+
+def parse_grade_file(uploaded_file, file_hash: str, previous_analyzer: Analyzer | None) -> tuple:
+    """
+    Parses an uploaded grade file (or loads its snapshot) and creates its analyzer
+
+    Parameters:
+        uploaded_file: Uploaded file object from Streamlit file_uploader
+        file_hash (str): The hash of the file contents
+        previous_analyzer (Analyzer | None): The analyzer of the previously uploaded export, whose unchanged assignments are reused
+
+    Returns:
+        tuple: The (grade parser, analyzer) pair and its estimated size in bytes
+    """
+
+    snapshot_path = os.path.join(SNAPSHOT_DIR, file_hash) if SNAPSHOT_DIR else None
+
+    if snapshot_path and is_snapshot(snapshot_path):
+        grade_parser = GradeParser.from_snapshot(snapshot_path)
+    else:
+        grade_parser = GradeParser(uploaded_file)
+
+        if snapshot_path:
+            grade_parser.save_snapshot(snapshot_path)
+
+    # Each assignment is analyzed when it is first viewed
+    if previous_analyzer is not None:
+        analyzer = Analyzer.from_previous(
+            previous_analyzer,
+            grade_parser.get_grade_matrix(),
+            grade_parser.get_raw_assignment_titles(),
+            grade_parser.get_assignment_max_points(),
+            lazy=True,
+            status_matrix=grade_parser.get_status_matrix()
+        )
+    else:
+        analyzer = Analyzer(
+            grade_parser.get_grade_matrix(),
+            grade_parser.get_raw_assignment_titles(),
+            grade_parser.get_assignment_max_points(),
+            lazy=True,
+            status_matrix=grade_parser.get_status_matrix()
+        )
+
+    # Reused assignments from the previous export are counted as well
+    size = uploaded_file.size + analyzer.get_estimated_size()
+
+    return (grade_parser, analyzer), size
+
+if WARM_UP:
+    start_warm_up()
+
 # Create file uploader widget
 uploaded_file = st.file_uploader(
     "Choose a CSV file", 
@@ -22,44 +243,73 @@ if 'grade_parser' not in st.session_state:
     st.session_state.grade_parser = None
 if 'analyzer' not in st.session_state:
     st.session_state.analyzer = None
-if 'current_file_name' not in st.session_state:
-    st.session_state.current_file_name = None
+if 'current_file_id' not in st.session_state:
+    st.session_state.current_file_id = None
+if 'current_file_hash' not in st.session_state:
+    st.session_state.current_file_hash = None
 
 # Check if a file has been uploaded
 if uploaded_file is not None:
-    # Only parse if it's a new file or we haven't parsed yet
-    file_changed = (st.session_state.current_file_name != uploaded_file.name)
+    # Only hash the file once per upload, not on every rerun
+    if st.session_state.current_file_id != uploaded_file.file_id:
+        file_hash = hash_file(uploaded_file)
+    else:
+        file_hash = st.session_state.current_file_hash
+
+    # Only parse if the file contents changed or we haven't parsed yet
+    file_changed = (st.session_state.current_file_hash != file_hash)
     need_to_parse = (st.session_state.grade_parser is None or file_changed)
     
     if need_to_parse:
         # Show processing message
         with st.spinner("Processing grade file..."):
             try:
-                # Parse the CSV (only happens once per file)
-                st.session_state.grade_parser = GradeParser(uploaded_file)
+                # Parse the CSV and create the analyzer (only happens once per file contents across all sessions)
+                # A re-export of the same gradebook only recomputes the assignments that changed
+                parse_cache = get_parse_cache()
+                previous_analyzer = st.session_state.analyzer
+                parsed = []
+
+                def create_entry():
+                    parsed.append(True)
+                    return parse_grade_file(uploaded_file, file_hash, previous_analyzer)
+
+                entry = parse_cache.get_or_create(file_hash, create_entry)
+                st.session_state.grade_parser, st.session_state.analyzer = entry
                 
-                # Create analyzer (only happens once per file)
-                raw_assignment_titles = st.session_state.grade_parser.get_raw_assignment_titles()
-                max_points = st.session_state.grade_parser.get_assignment_max_points()
-
-                st.session_state.analyzer = Analyzer(
-                    st.session_state.grade_parser.get_student_data(), 
-                    raw_assignment_titles,
-                    max_points
+                # Store current file
+                st.session_state.current_file_id = uploaded_file.file_id
+                st.session_state.current_file_hash = file_hash
+
+                # Log one JSON line per upload with the time spent in each parsing stage
+                st.session_state.grade_parser.get_timings().log(
+                    event="upload",
+                    file_hash=file_hash,
+                    file_size=uploaded_file.size,
+                    students=st.session_state.grade_parser.grade_matrix.height,
+                    assignments=len(st.session_state.grade_parser.get_raw_assignment_titles()),
+                    cached=not parsed
                 )
                 
-                # Store current file name
-                st.session_state.current_file_name = uploaded_file.name
-                
                 st.success("File processed successfully!")
+
+                # Everything else is computed in the background, and whatever is done is picked up on later reruns
+                future = st.session_state.analyzer.start_precompute(get_precompute_executor())
+
+                # The cached entry grows as its assignments are computed, so it is measured again once they are done
+                if parsed:
+                    future.add_done_callback(
+                        lambda _, key=file_hash, entry=entry, file_size=uploaded_file.size: parse_cache.resize(key, entry, file_size + entry[1].get_estimated_size())
+                    )
                 
             except Exception as e:
-                st.error(f"Error reading file: {e.message}")
+                st.error(f"Error reading file: {e}")
                 st.write("Please make sure you uploaded a valid Canvas grade report file.")
                 # Clear session state on error
                 st.session_state.grade_parser = None
                 st.session_state.analyzer = None
-                st.session_state.current_file_name = None
+                st.session_state.current_file_id = None
+                st.session_state.current_file_hash = None
                 st.stop()  # Stop execution if there's an error
     
     # Show file info and controls if data has been parsed
@@ -69,6 +319,12 @@ if uploaded_file is not None:
 
         # Have toggle for anonymizing the names
         anonymize = st.toggle("Anonymize names", value=False)
+
+        # Have toggle for checking the grades for data-entry problems
+        check_anomalies = st.toggle("Check for grade-entry problems", value=True)
+
+        # Have toggle for showing where the processing time went
+        show_diagnostics = st.toggle("Show diagnostics", value=False)
         
         col1, col2 = st.columns(2)
         
@@ -79,12 +335,68 @@ if uploaded_file is not None:
             b_to_mb_ratio = 1 / (1024 * 1024)
             st.info(f"**File Size:** {file_size * b_to_mb_ratio:,.2f} MB")
 
+        # Show the views across all assignments, as percentages of each assignment's max points
+        if st.session_state.analyzer is not None:
+            # Only refresh the progress while the background computation is running
+            future = st.session_state.analyzer.precompute_future
+            if future is not None and not future.done():
+                show_precompute_progress(st.session_state.analyzer)
+            elif future is not None and future.exception() is not None:
+                st.warning(f"Preparing the assignments in the background failed: {future.exception()}")
+
+            # The views across all assignments need at least one assignment, like the assignment selector below
+            assignments = st.session_state.grade_parser.get_assignment_titles()
+
+            if assignments:
+                # Point out grades that look like typos before anything else is read
+                if check_anomalies:
+                    anomalies = st.session_state.analyzer.get_anomalies(anonymize)
+
+                    if anomalies.height:
+                        st.warning(f"Found {anomalies.height:,} possible grade-entry problems.")
+                        with st.expander("Possible Grade-Entry Problems"):
+                            st.dataframe(anomalies, hide_index=True)
+
+                with st.expander("Course Overview"):
+                    st.subheader("Student Averages")
+                    show_student_averages_table(st.session_state.analyzer, anonymize, "averages")
+
+                    st.subheader("Section Means (%)")
+                    st.dataframe(st.session_state.analyzer.get_section_means())
+
+                # Show how the assignments relate to each other and how well each one separates students
+                with st.expander("Assignment Correlations"):
+                    st.subheader("Correlation Between Assignments")
+                    st.plotly_chart(st.session_state.analyzer.get_correlation_heatmap())
+
+                    st.subheader("Item Analysis")
+                    st.dataframe(st.session_state.analyzer.get_item_analysis(), hide_index=True)
+
+                # Show everything about one student, looked up by their ID
+                with st.expander("Student Report"):
+                    student_ids = {label: student_id for student_id, label in st.session_state.analyzer.get_student_labels(anonymize).items()}
+                    selected_student = st.selectbox(
+                        "Select a student:",
+                        list(student_ids),
+                        index=None,
+                        key="student_selector"
+                    )
+
+                    if selected_student is not None:
+                        student_report = st.session_state.analyzer.get_student_report(student_ids[selected_student])
+                        graded = student_report.filter(pl.col("Percentage").is_not_null())
+
+                        col1, col2, col3 = st.columns(3)
+                        col1.metric("Average (%)", f"{graded['Percentage'].mean():.1f}" if graded.height else "-")
+                        col2.metric("Section Average (%)", f"{graded['Section Mean (%)'].mean():.1f}" if graded.height else "-")
+                        col3.metric("Graded Assignments", f"{graded.height} of {student_report.height}")
+
+                        st.dataframe(student_report)
+
         st.subheader("Assignment Analysis")
         
         # Assignment selector
         if st.session_state.analyzer is not None:
-            assignments = st.session_state.grade_parser.get_assignment_titles()
-            
             if assignments:
                 selected_assignment = st.selectbox(
                     "Select an assignment to analyze:",
@@ -101,15 +413,17 @@ if uploaded_file is not None:
                     st.subheader("Basic Statistics")
                     st.dataframe(st.session_state.analyzer.get_basic_statistics()[raw_assignment_title])
 
+                    # Show the basic statistics for each section
+                    st.subheader("Basic Statistics by Section")
+                    st.dataframe(st.session_state.analyzer.get_section_statistics(raw_assignment_title))
+
                     # Show the rankings
                     st.subheader("Student Rankings")
-                    raw_assignment_rankings = st.session_state.analyzer.get_assignment_rankings_by_assignment(raw_assignment_title, anonymize)
-                    cleaned_assignment_rankings = st.session_state.analyzer.get_students_with_grade(raw_assignment_rankings)
-                    st.dataframe(cleaned_assignment_rankings)
+                    show_ranking_table(st.session_state.analyzer, raw_assignment_title, anonymize, True, "graded")
 
                     # Show the students without a grade
                     st.subheader("Students without a grade")
-                    st.dataframe(st.session_state.analyzer.get_students_without_grade(raw_assignment_rankings))
+                    show_ranking_table(st.session_state.analyzer, raw_assignment_title, anonymize, False, "ungraded")
 
                     # Show the grade distribution
                     st.subheader("Grade Distribution")
@@ -122,6 +436,18 @@ if uploaded_file is not None:
                     # Show the histogram
                     st.subheader("Histogram")
                     st.plotly_chart(st.session_state.analyzer.get_histograms()[raw_assignment_title])
+
+                    # Show each student's grade against their rank
+                    st.subheader("Scores by Rank")
+                    st.plotly_chart(st.session_state.analyzer.get_score_plots()[raw_assignment_title])
+
+                    # Show the time and memory spent in each stage so far
+                    if show_diagnostics:
+                        st.subheader("Diagnostics")
+                        parse_timings = st.session_state.grade_parser.get_timings()
+                        analysis_timings = st.session_state.analyzer.get_timings()
+                        st.write(f"Parsing took {parse_timings.get_total_seconds():.3f} s and analysis so far took {analysis_timings.get_total_seconds():.3f} s.")
+                        st.dataframe(pl.concat([parse_timings.to_dataframe(), analysis_timings.to_dataframe()]))
             
             else:
                 st.warning("No assignments found in the uploaded file.")
@@ -131,7 +457,8 @@ else:
     if st.session_state.grade_parser is not None:
         st.session_state.grade_parser = None
         st.session_state.analyzer = None
-        st.session_state.current_file_name = None
+        st.session_state.current_file_id = None
+        st.session_state.current_file_hash = None
         st.rerun()  # Refresh to clear the interface
     
     st.info("Please upload a Canvas grade export CSV file to begin analysis.")
@@ -0,0 +1,182 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+# Defaults can be overridden per server with environment variables
+DEFAULT_MAX_ENTRIES = int(os.environ.get("CANVAS_ANALYZER_CACHE_ENTRIES", "32"))
+DEFAULT_MAX_MEGABYTES = float(os.environ.get("CANVAS_ANALYZER_CACHE_MB", "1024"))
+
+def hash_file(file_object) -> str:
+    """
+    Hashes the contents of a file object so identical exports share a cache key
+
+    Parameters:
+        file_object: Uploaded file object (e.g., from Streamlit file_uploader)
+
+    Returns:
+        str: The hex digest of the file contents
+    """
+
+    digest = hashlib.blake2b(digest_size=32)
+
+    # In-memory uploads can be hashed without copying, other files are read in chunks
+    if hasattr(file_object, "getbuffer"):
+        with file_object.getbuffer() as buffer:
+            digest.update(buffer)
+    else:
+        file_object.seek(0)
+        for chunk in iter(lambda: file_object.read(1024 * 1024), b""):
+            digest.update(chunk)
+        file_object.seek(0)
+
+    return digest.hexdigest()
+
+class ParseCache:
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_megabytes: float = DEFAULT_MAX_MEGABYTES) -> None:
+        """
+        Initializes a process-wide, least recently used cache of parsed grade files,
+        keyed by the hash of the file contents
+
+        Parameters:
+            max_entries (int): The maximum number of parsed files to keep
+            max_megabytes (float): The maximum estimated memory used by the parsed files
+
+        Returns:
+            None
+        """
+
+        self.max_entries = max_entries
+        self.max_bytes = int(max_megabytes * 1024 * 1024)
+        self.entries = OrderedDict()
+        self.entry_sizes = {}
+        self.total_bytes = 0
+
+        self.lock = threading.Lock()
+        self.key_locks = {}
+
+    def get(self, key: str):
+        """
+        Returns the cached entry for a file hash and marks it as recently used
+
+        Parameters:
+            key (str): The file hash
+
+        Returns:
+            The cached entry, or None if the file has not been parsed
+        """
+
+        with self.lock:
+            if key not in self.entries:
+                return None
+
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def put(self, key: str, entry, size: int) -> None:
+        """
+        Stores an entry and evicts the least recently used entries until the cache fits its limits
+
+        Parameters:
+            key (str): The file hash
+            entry: The parsed results to cache
+            size (int): The estimated size of the entry in bytes
+
+        Returns:
+            None
+        """
+
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= self.entry_sizes[key]
+
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            self.entry_sizes[key] = size
+            self.total_bytes += size
+
+            self.evict()
+
+    def resize(self, key: str, entry, size: int) -> None:
+        """
+        Updates the estimated size of an entry that grew after it was stored (e.g. once its analysis was
+        precomputed) and evicts the least recently used entries until the cache fits its limits again.
+        Nothing happens if the entry was evicted or replaced in the meantime.
+
+        Parameters:
+            key (str): The file hash
+            entry: The cached entry that grew
+            size (int): The new estimated size of the entry in bytes
+
+        Returns:
+            None
+        """
+
+        with self.lock:
+            if self.entries.get(key) is not entry:
+                return
+
+            self.total_bytes += size - self.entry_sizes[key]
+            self.entry_sizes[key] = size
+
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        Evicts the least recently used entries until the cache fits its limits. Must be called with the lock held.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+
+        # Always keep the newest entry, even if it alone is over the memory cap
+        while len(self.entries) > 1 and (len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes):
+            old_key, _ = self.entries.popitem(last=False)
+            self.total_bytes -= self.entry_sizes.pop(old_key)
+
+    def get_or_create(self, key: str, create):
+        """
+        Returns the cached entry for a file hash, building it if needed. Sessions asking
+        for the same file at the same time wait for a single build instead of repeating it.
+
+        Parameters:
+            key (str): The file hash
+            create: Callable returning the entry and its estimated size in bytes
+
+        Returns:
+            The cached or newly built entry
+        """
+
+        with self.lock:
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            entry = self.get(key)
+
+            if entry is None:
+                entry, size = create()
+                self.put(key, entry, size)
+
+        with self.lock:
+            self.key_locks.pop(key, None)
+
+        return entry
+
+    def clear(self) -> None:
+        """
+        Removes every cached entry
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+
+        with self.lock:
+            self.entries.clear()
+            self.entry_sizes.clear()
+            self.total_bytes = 0
@@ -1,8 +1,157 @@
+import math
+import sys
+from array import array
+
+class GradeStore:
+    __slots__ = ("assignment_index", "columns", "row_count")
+
+    def __init__(self, assignments: list[str] | None = None, row_count: int = 0) -> None:
+        """
+        Initializes a grade store shared by many students: one float array per assignment with one
+        entry per student, and a single index from assignment title to array. Missing grades are NaN.
+
+        Parameters:
+            assignments (list[str] | None): The assignment titles
+            row_count (int): The number of students (rows) to make room for
+
+        Returns:
+            None
+        """
+
+        self.assignment_index = {}
+        self.columns = []
+        self.row_count = row_count
+
+        for assignment in assignments or []:
+            self.add_assignment(assignment)
+
+    @classmethod
+    def from_columns(cls, assignments: list[str], columns: list[list]) -> "GradeStore":
+        """
+        Creates a grade store from one list of grades per assignment (None for missing grades)
+
+        Parameters:
+            assignments (list[str]): The assignment titles
+            columns (list[list]): The grades of every student, one list per assignment
+
+        Returns:
+            GradeStore: The grade store
+        """
+
+        store = cls(row_count=len(columns[0]) if columns else 0)
+
+        for assignment, column in zip(assignments, columns):
+            store.assignment_index[sys.intern(assignment)] = len(store.columns)
+            store.columns.append(array("d", [math.nan if grade is None else grade for grade in column]))
+
+        return store
+
+    def add_assignment(self, assignment: str) -> int:
+        """
+        Adds an assignment with no grades yet
+
+        Parameters:
+            assignment (str): The assignment title
+
+        Returns:
+            int: The index of the assignment's array
+        """
+
+        self.assignment_index[sys.intern(assignment)] = len(self.columns)
+        self.columns.append(array("d", [math.nan]) * self.row_count)
+
+        return len(self.columns) - 1
+
+    def add_row(self) -> int:
+        """
+        Adds a student with no grades yet
+
+        Parameters:
+            None
+
+        Returns:
+            int: The student's row
+        """
+
+        for column in self.columns:
+            column.append(math.nan)
+
+        self.row_count += 1
+
+        return self.row_count - 1
+
+    def get(self, row: int, assignment: str) -> float | None:
+        """
+        Returns a student's grade for an assignment
+
+        Parameters:
+            row (int): The student's row
+            assignment (str): The assignment title
+
+        Returns:
+            float | None: The grade, or None if it is missing
+        """
+
+        grade = self.columns[self.assignment_index[assignment]][row]
+
+        return None if math.isnan(grade) else grade
+
+    def set(self, row: int, assignment: str, grade) -> None:
+        """
+        Sets a student's grade for an assignment, adding the assignment if needed. Grades that
+        are not numbers (missing, EX, etc.) are stored as missing.
+
+        Parameters:
+            row (int): The student's row
+            assignment (str): The assignment title
+            grade: The grade
+
+        Returns:
+            None
+        """
+
+        if assignment not in self.assignment_index:
+            self.add_assignment(assignment)
+
+        try:
+            grade = math.nan if grade is None else float(grade)
+        except ValueError:
+            grade = math.nan
+
+        self.columns[self.assignment_index[assignment]][row] = grade
+
+    def get_row(self, row: int) -> dict:
+        """
+        Returns every grade of a student
+
+        Parameters:
+            row (int): The student's row
+
+        Returns:
+            dict: A dictionary of assignment titles and their grades (None if missing)
+        """
+
+        return {assignment: self.get(row, assignment) for assignment in self.assignment_index}
+
 class Student:
-    def __init__(self, first_name: str, last_name: str, student_id: str, section: str) -> None:
+    __slots__ = ("first_name", "last_name", "student_id", "section", "store", "row")
+
+    def __init__(self, first_name: str, last_name: str, student_id: str, section: str, store: GradeStore | None = None, row: int | None = None) -> None:
         """ 
         Initializes a student profile using their identifying information
-        along with their grades for each assignment
+        along with their grades for each assignment. The grades live in a
+        grade store that can be shared by all students of a course.
+
+        Parameters:
+            first_name (str): The student's first name
+            last_name (str): The student's last name
+            student_id (str): The student's user ID
+            section (str): The student's section
+            store (GradeStore | None): The shared grade store, or None to give the student their own
+            row (int | None): The student's row in the store, or None to add a new row
+
+        Returns:
+            None
         """
 
         self.first_name = first_name
@@ -10,7 +159,8 @@ class Student:
         self.student_id = student_id
         self.section = section
 
-        self.grades = {}
+        self.store = store if store is not None else GradeStore()
+        self.row = row if row is not None else self.store.add_row()
 
     def add_grade(self, assignment_title: str, grade: float) -> None:
         """
@@ -24,9 +174,9 @@ class Student:
             None
         """
 
-        self.grades[assignment_title] = grade
+        self.store.set(self.row, assignment_title, grade)
 
-    def get_grade(self, assignment_title: str) -> float:
+    def get_grade(self, assignment_title: str) -> float | None:
         """
         Returns the grade for an assignment
 
@@ -34,9 +184,9 @@ class Student:
             assignment_title (str): The title of the assignment
 
         Returns:
-            float: The grade for the assignment
+            float | None: The grade for the assignment, or None if it is missing
         """
-        return self.grades[assignment_title]
+        return self.store.get(self.row, assignment_title)
     
     def get_name(self) -> str:
         """
@@ -84,5 +234,5 @@ class Student:
         Returns:
             dict: A dictionary of assignment titles and their corresponding grades
         """
-        return self.grades
+        return self.store.get_row(self.row)
     
\ No newline at end of file
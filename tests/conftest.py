@@ -0,0 +1,70 @@
+import csv
+from pathlib import Path
+
+import pytest
+from analyzer import Analyzer
+from grade_parser import GradeParser
+
+def write_gradebook(path: Path, assignments: list[tuple[str, float]], students: list[tuple]) -> Path:
+    """
+    Writes a small Canvas "Export Entire Gradebook" CSV: the posting and Points Possible rows, one row
+    per student and the test student row at the end
+
+    Parameters:
+        path (Path): Where to write the CSV
+        assignments (list[tuple[str, float]]): The column name and max points of each assignment
+        students (list[tuple]): The "Last, First" name, ID, section and grades (as written in the CSV) of each student
+
+    Returns:
+        Path: The path of the CSV
+    """
+
+    with open(path, "w", newline="") as file_object:
+        writer = csv.writer(file_object)
+        writer.writerow(["Student", "ID", "SIS User ID", "SIS Login ID", "Section"] + [column for column, _ in assignments] + ["Current Score", "Unposted Current Score"])
+        writer.writerow(["    Manual Posting", "", "", "", ""] + ["Manual Posting"] * len(assignments) + ["", ""])
+        writer.writerow(["    Points Possible", "", "", "", ""] + [f"{points:.2f}" for _, points in assignments] + ["(read only)", "(read only)"])
+
+        for name, student_id, section, grades in students:
+            writer.writerow([name, student_id, "", "", section] + [str(grade) for grade in grades] + ["", ""])
+
+        writer.writerow(["Student, Test", "999999", "", "", students[0][2] if students else ""] + ["0.00"] * len(assignments) + ["", ""])
+
+    return path
+
+def make_analyzer(grade_parser: GradeParser, lazy: bool = True) -> Analyzer:
+    """
+    Creates an analyzer for a parsed gradebook the way the app and the batch mode do
+
+    Parameters:
+        grade_parser (GradeParser): The parsed gradebook
+        lazy (bool): Whether to compute each assignment on first request
+
+    Returns:
+        Analyzer: The analyzer
+    """
+
+    return Analyzer(
+        grade_parser.get_grade_matrix(),
+        grade_parser.get_raw_assignment_titles(),
+        grade_parser.get_assignment_max_points(),
+        lazy=lazy,
+        status_matrix=grade_parser.get_status_matrix()
+    )
+
+@pytest.fixture
+def gradebook(tmp_path):
+    """
+    Returns a function that writes a gradebook CSV into the test's temporary folder and parses it
+
+    Parameters:
+        tmp_path (Path): The test's temporary folder
+
+    Returns:
+        function: Takes the assignments, the students and optionally a file name, and returns the GradeParser
+    """
+
+    def parse(assignments: list[tuple[str, float]], students: list[tuple], name: str = "gradebook.csv") -> GradeParser:
+        return GradeParser(write_gradebook(tmp_path / name, assignments, students))
+
+    return parse
@@ -0,0 +1,60 @@
+from conftest import make_analyzer
+
+def make_students(grades: list[list], sections: list[str] | None = None) -> list[tuple]:
+    """
+    Returns one student per row of grades, with made-up names and IDs
+
+    Parameters:
+        grades (list[list]): The grades of each student
+        sections (list[str] | None): The section of each student, all in one section if None
+
+    Returns:
+        list[tuple]: The students
+    """
+
+    sections = sections or ["COURSE 101-500"] * len(grades)
+
+    return [(f"Student, {index}", str(1000 + index), section, row) for index, (row, section) in enumerate(zip(grades, sections))]
+
+def test_identical_grades_are_not_flagged(gradebook):
+    # A completion item everyone got full marks on has no standard deviation
+    analyzer = make_analyzer(gradebook([("Completion (1001)", 10.0)], make_students([[10]] * 6)))
+
+    assert analyzer.get_anomalies(False).height == 0
+
+def test_extra_credit_worth_no_points_is_not_above_max(gradebook):
+    grades = [[9, 1], [8, 2], [7, ""], [10, 1]]
+    analyzer = make_analyzer(gradebook([("Homework 1 (1001)", 10.0), ("Extra Credit (1002)", 0.0)], make_students(grades)))
+
+    assert analyzer.get_anomalies(False).height == 0
+
+def test_data_entry_mistakes_are_flagged(gradebook):
+    # 85 instead of 8.5, a negative grade, and one section with no quiz grades at all
+    grades = [[9, 18], [85, 17], [-1, 16], [8, ""], [7, ""]]
+    sections = ["COURSE 101-500"] * 3 + ["COURSE 101-501"] * 2
+    analyzer = make_analyzer(gradebook([("Homework 1 (1001)", 10.0), ("Quiz 1 (1002)", 20.0)], make_students(grades, sections)))
+
+    anomalies = analyzer.get_anomalies(False)
+    flagged = set(zip(anomalies["Issue"], anomalies["Assignment"], anomalies["ID"]))
+
+    assert ("Above max points", "Homework 1 (1001)", "1001") in flagged
+    assert ("Negative grade", "Homework 1 (1001)", "1002") in flagged
+    assert ("Blank for the whole section", "Quiz 1 (1002)", None) in flagged
+    assert not any(issue == "Unusual for the assignment" for issue, _, _ in flagged)
+
+def test_outlier_far_from_the_mean_is_flagged(gradebook):
+    grades = [[50 + index % 5] for index in range(60)] + [[0]]
+    analyzer = make_analyzer(gradebook([("Exam 1 (1001)", 100.0)], make_students(grades)))
+
+    anomalies = analyzer.get_anomalies(True)
+    assert anomalies["Issue"].to_list() == ["Unusual for the assignment"]
+    assert "ID" not in anomalies.columns
+    assert anomalies["Name"].item() == analyzer.get_student_labels(True)["1060"]
+
+def test_no_assignments(gradebook):
+    analyzer = make_analyzer(gradebook([], make_students([[]] * 3)))
+
+    anomalies = analyzer.get_anomalies(False)
+    assert anomalies.height == 0
+    assert anomalies.columns == ["Issue", "Assignment", "Section", "ID", "Name", "Grade", "Max Points", "Detail"]
+    assert analyzer.get_anomalies(True).height == 0
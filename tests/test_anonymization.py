@@ -0,0 +1,25 @@
+from conftest import make_analyzer
+
+ASSIGNMENTS = [("Homework 1 (1001)", 10.0)]
+STUDENTS = [
+    ("Lee, Alex", "1001", "COURSE 101-500", [9]),
+    ("Garcia, Sam", "1002", "COURSE 101-500", [7]),
+    ("Kim, Riley", "1003", "COURSE 101-501", [8]),
+]
+
+def test_pseudonyms_are_stable_across_re_exports(gradebook):
+    labels = make_analyzer(gradebook(ASSIGNMENTS, STUDENTS, "first.csv")).get_student_labels(True)
+
+    # A later export adds a student in a new section and moves another student to it
+    students = STUDENTS[:2] + [("Kim, Riley", "1003", "COURSE 101-502", [8]), ("Patel, Quinn", "1004", "COURSE 101-502", [6])]
+    new_labels = make_analyzer(gradebook(ASSIGNMENTS, students, "second.csv")).get_student_labels(True)
+
+    assert {student_id: new_labels[student_id] for student_id in labels} == labels
+    assert new_labels["1004"] not in labels.values()
+
+def test_pseudonyms_do_not_contain_names_or_ids(gradebook):
+    analyzer = make_analyzer(gradebook(ASSIGNMENTS, STUDENTS))
+
+    for student_id, pseudonym in analyzer.get_student_labels(True).items():
+        assert pseudonym.startswith("Student ")
+        assert student_id not in pseudonym
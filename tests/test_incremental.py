@@ -0,0 +1,66 @@
+from analyzer import Analyzer
+from conftest import make_analyzer
+
+ASSIGNMENTS = [("Homework 1 (1001)", 10.0), ("Quiz 1 (1002)", 20.0), ("Exam 1 (1003)", 100.0)]
+STUDENTS = [
+    ("Lee, Alex", "1001", "COURSE 101-500", [9, 15, 80]),
+    ("Garcia, Sam", "1002", "COURSE 101-500", [7, "EX", 90]),
+    ("Kim, Riley", "1003", "COURSE 101-501", [8, 18, ""]),
+]
+
+def reanalyze(gradebook, students: list[tuple]) -> tuple[Analyzer, Analyzer]:
+    """
+    Analyzes the gradebook above, then a new export of it with the given students, reusing the first analysis
+
+    Parameters:
+        gradebook: The gradebook fixture
+        students (list[tuple]): The students of the new export
+
+    Returns:
+        tuple[Analyzer, Analyzer]: The previous analyzer (with everything computed) and the new one
+    """
+
+    previous = make_analyzer(gradebook(ASSIGNMENTS, STUDENTS, "previous.csv"), lazy=False)
+    grade_parser = gradebook(ASSIGNMENTS, students, "current.csv")
+
+    return previous, Analyzer.from_previous(
+        previous,
+        grade_parser.get_grade_matrix(),
+        grade_parser.get_raw_assignment_titles(),
+        grade_parser.get_assignment_max_points(),
+        lazy=True,
+        status_matrix=grade_parser.get_status_matrix()
+    )
+
+def test_only_changed_assignments_are_recomputed(gradebook):
+    # One exam grade is entered, the homework and quiz are untouched
+    students = STUDENTS[:2] + [("Kim, Riley", "1003", "COURSE 101-501", [8, 18, 70])]
+    previous, analyzer = reanalyze(gradebook, students)
+
+    assert analyzer.find_unchanged_assignments(previous) == ["Homework 1 (1001)", "Quiz 1 (1002)"]
+
+    # Unchanged assignments share the previous results, the changed one is computed from the new grades
+    assert analyzer.assignment_rankings["Homework 1 (1001)"] is previous.assignment_rankings["Homework 1 (1001)"]
+    assert analyzer.get_histograms()["Quiz 1 (1002)"] is previous.get_histograms()["Quiz 1 (1002)"]
+    assert analyzer.get_assignment_rankings_by_assignment("Exam 1 (1003)", False)["Grade"].to_list() == [90.0, 80.0, 70.0]
+
+    # The merged statistics match a fresh analysis of the new export
+    fresh = make_analyzer(gradebook(ASSIGNMENTS, students, "fresh.csv"), lazy=False)
+    assert analyzer.get_statistics_summary().equals(fresh.get_statistics_summary())
+    assert analyzer.get_section_statistics_summary().equals(fresh.get_section_statistics_summary())
+
+def test_status_change_counts_as_a_change(gradebook):
+    # The excused quiz becomes incomplete, which has no grade either way
+    students = [STUDENTS[0], ("Garcia, Sam", "1002", "COURSE 101-500", [7, "incomplete", 90]), STUDENTS[2]]
+    previous, analyzer = reanalyze(gradebook, students)
+
+    assert analyzer.find_unchanged_assignments(previous) == ["Homework 1 (1001)", "Exam 1 (1003)"]
+    assert analyzer.get_assignment_rankings_by_assignment("Quiz 1 (1002)", False)["Status"].to_list() == [None, None, "incomplete"]
+
+def test_roster_change_reuses_nothing(gradebook):
+    # A student switching sections changes every section statistic
+    students = STUDENTS[:2] + [("Kim, Riley", "1003", "COURSE 101-500", [8, 18, ""])]
+    previous, analyzer = reanalyze(gradebook, students)
+
+    assert analyzer.find_unchanged_assignments(previous) == []
+    assert analyzer.assignment_rankings["Homework 1 (1001)"] is not previous.assignment_rankings["Homework 1 (1001)"]
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+from conftest import make_analyzer
+
+ASSIGNMENTS = [("Homework 1 (1001)", 10.0), ("Quiz 1 (1002)", 20.0), ("Exam 1 (1003)", 100.0), ("Survey (1004)", 5.0)]
+
+def test_correlations_match_numpy_on_complete_grades(gradebook):
+    rng = np.random.default_rng(0)
+    grades = np.column_stack([rng.uniform(0, points, 30).round(1) for _, points in ASSIGNMENTS])
+    students = [(f"Student, {index}", str(1000 + index), "COURSE 101-500", list(row)) for index, row in enumerate(grades)]
+    analyzer = make_analyzer(gradebook(ASSIGNMENTS, students))
+
+    correlations = analyzer.get_correlation_matrix()
+    assert correlations["Assignment"].to_list() == [column for column, _ in ASSIGNMENTS]
+    np.testing.assert_allclose(correlations.drop("Assignment").to_numpy(), np.corrcoef(grades, rowvar=False), atol=1e-9)
+
+def test_correlations_only_use_students_graded_on_both(gradebook):
+    students = [
+        ("Lee, Alex", "1001", "COURSE 101-500", [10, 20, 100, ""]),
+        ("Garcia, Sam", "1002", "COURSE 101-500", [8, 16, 80, ""]),
+        ("Kim, Riley", "1003", "COURSE 101-500", [6, 12, "", 5]),
+        ("Patel, Quinn", "1004", "COURSE 101-501", [4, 8, 40, 5]),
+        ("Davis, Drew", "1005", "COURSE 101-501", [2, "", 20, ""]),
+    ]
+    analyzer = make_analyzer(gradebook(ASSIGNMENTS, students))
+    correlations = {row["Assignment"]: row for row in analyzer.get_correlation_matrix().iter_rows(named=True)}
+
+    # The quiz and the exam follow the homework exactly for every student graded on both, whatever the blanks elsewhere
+    assert correlations["Homework 1 (1001)"]["Quiz 1 (1002)"] == pytest.approx(1.0)
+    assert correlations["Homework 1 (1001)"]["Exam 1 (1003)"] == pytest.approx(1.0)
+
+    # Only two students have both the survey and the homework, too few for a correlation
+    assert correlations["Homework 1 (1001)"]["Survey (1004)"] is None
+    assert correlations["Survey (1004)"]["Survey (1004)"] is None
+
+def test_item_analysis(gradebook):
+    students = [
+        ("Lee, Alex", "1001", "COURSE 101-500", [10, 20, 95, 5]),
+        ("Garcia, Sam", "1002", "COURSE 101-500", [8, 15, 75, 5]),
+        ("Kim, Riley", "1003", "COURSE 101-500", [5, 10, 55, 5]),
+        ("Patel, Quinn", "1004", "COURSE 101-501", [0, 5, 35, 5]),
+        ("Davis, Drew", "1005", "COURSE 101-501", ["", 0, 15, ""]),
+    ]
+    analyzer = make_analyzer(gradebook(ASSIGNMENTS, students))
+    items = {row["Assignment"]: row for row in analyzer.get_item_analysis().iter_rows(named=True)}
+
+    homework = items["Homework 1 (1001)"]
+    assert homework["Graded"] == 4
+    assert homework["Missing (%)"] == pytest.approx(20.0)
+    assert homework["Mean (%)"] == pytest.approx(57.5)
+    assert homework["Ceiling (%)"] == pytest.approx(25.0)
+    assert homework["Floor (%)"] == pytest.approx(25.0)
+
+    # Stronger students do better on the exam, and everyone got full marks on the survey
+    assert items["Exam 1 (1003)"]["Discrimination"] > 0.9
+    assert items["Survey (1004)"]["Discrimination"] is None
+    assert items["Survey (1004)"]["Ceiling (%)"] == pytest.approx(100.0)
+
+def test_no_assignments(gradebook):
+    analyzer = make_analyzer(gradebook([], [("Lee, Alex", "1001", "COURSE 101-500", [])]))
+
+    assert analyzer.get_item_analysis().height == 0
+    assert analyzer.get_correlation_matrix().columns == ["Assignment"]
+    assert len(analyzer.get_correlation_heatmap().data) == 0
+
+def test_constant_non_integer_grades_have_no_correlation(gradebook):
+    # Rounding makes the one-pass variance of 2,000 grades of 7.3 a tiny positive number instead of zero
+    students = [(f"Student, {index}", str(1000 + index), "COURSE 101-500", [7.3, index % 20, (index * 7) % 100]) for index in range(2000)]
+    analyzer = make_analyzer(gradebook(ASSIGNMENTS[:3], students))
+
+    correlations = analyzer.get_correlation_matrix()
+    assert correlations["Homework 1 (1001)"].null_count() == 3
+    assert correlations.row(0)[1:] == (None, None, None)
+    assert correlations["Quiz 1 (1002)"][1] == pytest.approx(1.0)
+
+    items = {row["Assignment"]: row for row in analyzer.get_item_analysis().iter_rows(named=True)}
+    assert items["Homework 1 (1001)"]["Discrimination"] is None
+    assert items["Quiz 1 (1002)"]["Discrimination"] is not None
@@ -0,0 +1,38 @@
+from conftest import make_analyzer
+from parse_cache import ParseCache
+
+def test_resize_evicts_once_an_entry_grows():
+    cache = ParseCache(max_entries=10, max_megabytes=1)
+    first, second = ("first",), ("second",)
+    cache.put("a", first, 300 * 1024)
+    cache.put("b", second, 300 * 1024)
+
+    # The first entry's analysis was precomputed and no longer fits next to the second one
+    cache.resize("a", first, 900 * 1024)
+
+    assert cache.get("a") is None
+    assert cache.get("b") is second
+    assert cache.total_bytes == 300 * 1024
+
+def test_resize_ignores_evicted_or_replaced_entries():
+    cache = ParseCache(max_entries=1, max_megabytes=1)
+    first, second = ("first",), ("second",)
+    cache.put("a", first, 100)
+    cache.put("b", second, 100)
+
+    cache.resize("a", first, 200)
+    assert cache.get("a") is None
+
+    cache.put("b", ("third",), 100)
+    cache.resize("b", second, 500)
+    assert cache.total_bytes == 100
+
+def test_estimated_size_counts_precomputed_results(gradebook):
+    assignments = [(f"Homework {index} ({1000 + index})", 10.0) for index in range(4)]
+    students = [(f"Student, {index}", str(index), f"COURSE 101-{500 + index % 2}", [index % 11] * 4) for index in range(40)]
+    analyzer = make_analyzer(gradebook(assignments, students))
+
+    before = analyzer.get_estimated_size()
+    analyzer.precompute()
+
+    assert analyzer.get_estimated_size() > before
@@ -0,0 +1,86 @@
+import pytest
+from conftest import make_analyzer
+
+ASSIGNMENTS = [("Homework 1 (1001)", 10.0), ("Exam 1 (1002)", 100.0), ("Extra Credit (1003)", 0.0)]
+STUDENTS = [
+    ("Lee, Alex", "1001", "COURSE 101-500", [9, 50, 1]),
+    ("Garcia, Sam", "1002", "COURSE 101-500", [7, 90, ""]),
+    ("Kim, Riley", "1003", "COURSE 101-501", ["", 60, 2]),
+]
+
+def test_student_averages(gradebook):
+    analyzer = make_analyzer(gradebook(ASSIGNMENTS, STUDENTS))
+
+    # Extra credit has no max points, so it has no percentage and does not count
+    averages = analyzer.get_student_averages()
+    assert averages.columns == ["ID", "Name", "Section", "Average (%)", "Graded Assignments"]
+    assert averages.select("ID", "Average (%)", "Graded Assignments").rows() == [("1002", 80.0, 2), ("1001", 70.0, 2), ("1003", 60.0, 1)]
+
+def test_anonymized_student_averages_hide_names_and_ids(gradebook):
+    analyzer = make_analyzer(gradebook(ASSIGNMENTS, STUDENTS))
+    labels = analyzer.get_student_labels(True)
+
+    averages = analyzer.get_student_averages(True)
+    assert averages.columns == ["Name", "Section", "Average (%)", "Graded Assignments"]
+    assert averages["Name"].to_list() == [labels["1002"], labels["1001"], labels["1003"]]
+
+    page, total = analyzer.get_student_average_page(True, search="Lee")
+    assert (page.height, total) == (0, 0)
+
+def test_student_average_page(gradebook):
+    analyzer = make_analyzer(gradebook(ASSIGNMENTS, STUDENTS))
+
+    page, total = analyzer.get_student_average_page(False, page=2, page_size=2)
+    assert total == 3
+    assert page["ID"].to_list() == ["1003"]
+
+    page, total = analyzer.get_student_average_page(False, sections=["COURSE 101-500"], sort_by="Name")
+    assert total == 2
+    assert page["Name"].to_list() == ["Alex Lee", "Sam Garcia"]
+
+    page, total = analyzer.get_student_average_page(False, search="1003")
+    assert page.select("Name", "Average (%)").rows() == [("Riley Kim", 60.0)]
+
+def test_no_assignments(gradebook):
+    analyzer = make_analyzer(gradebook([], [student[:3] + ([],) for student in STUDENTS]))
+
+    averages = analyzer.get_student_averages()
+    assert averages["Average (%)"].null_count() == 3
+    assert averages["Graded Assignments"].to_list() == [0, 0, 0]
+
+    section_means = analyzer.get_section_means()
+    assert section_means.select("Section", "Students").rows() == [("COURSE 101-500", 2), ("COURSE 101-501", 1)]
+    assert section_means["Average (%)"].null_count() == 2
+
+def test_category_totals(gradebook):
+    assignments = [("Homework 1 (1001)", 10.0), ("Homework 2 (1002)", 10.0), ("Exam 1 (1003)", 100.0), ("Bonus (1004)", 0.0), ("Quiz 1 (1005)", 20.0)]
+    students = [
+        ("Lee, Alex", "1001", "COURSE 101-500", [8, 6, 90, 1, 20]),
+        ("Garcia, Sam", "1002", "COURSE 101-500", ["", "", 50, "", 0]),
+        ("Kim, Riley", "1003", "COURSE 101-501", [10, "", "", 2, ""]),
+        ("Patel, Quinn", "1004", "COURSE 101-501", ["", "", "", "", ""]),
+    ]
+    analyzer = make_analyzer(gradebook(assignments, students))
+
+    # The quiz is not mapped to a category, so it does not count anywhere
+    categories = {"Homework 1 (1001)": "Homework", "Homework 2 (1002)": "Homework", "Exam 1 (1003)": "Exams", "Bonus (1004)": "Bonus"}
+    totals = analyzer.get_category_totals(categories, {"Homework": 0.4, "Exams": 0.6, "Bonus": 0.1})
+
+    assert totals.columns == ["ID", "Name", "Section", "Homework (%)", "Exams (%)", "Bonus (%)", "Weighted Total (%)"]
+
+    # Missing grades are left out of the points possible, and the bonus worth 0 points has no percentage
+    rows = {row[0]: row[3:] for row in totals.rows()}
+    assert rows["1001"][:3] == (70.0, 90.0, None)
+    assert rows["1001"][3] == pytest.approx(82.0)
+    assert rows["1002"] == (None, 50.0, None, 50.0)
+    assert rows["1003"] == (100.0, None, None, 100.0)
+    assert rows["1004"] == (None, None, None, None)
+
+def test_category_totals_without_weights(gradebook):
+    analyzer = make_analyzer(gradebook(ASSIGNMENTS, STUDENTS))
+
+    totals = analyzer.get_category_totals({"Homework 1 (1001)": "Homework"})
+    assert totals.columns == ["ID", "Name", "Section", "Homework (%)"]
+    assert totals["Homework (%)"].to_list() == [90.0, 70.0, None]
+
+    assert analyzer.get_category_totals({}).columns == ["ID", "Name", "Section"]
@@ -0,0 +1,74 @@
+import polars as pl
+from benchmark import generate_gradebook
+from conftest import make_analyzer
+from grade_parser import GradeParser
+
+ASSIGNMENTS = [("Homework 1 (1001)", 10.0), ("Exam 1 (1002)", 100.0)]
+
+# Two students named Alex Lee in different sections, plus students around them so the sort moves rows
+STUDENTS = [
+    ("Lee, Alex", "1001", "COURSE 101-500", [9, 55]),
+    ("Garcia, Sam", "1002", "COURSE 101-500", [7, 90]),
+    ("Lee, Alex", "1003", "COURSE 101-501", [4, 80]),
+    ("Kim, Riley", "1004", "COURSE 101-501", ["", 70]),
+]
+
+def test_duplicate_names_stay_aligned_with_their_grades(gradebook):
+    analyzer = make_analyzer(gradebook(ASSIGNMENTS, STUDENTS))
+
+    rankings = analyzer.get_assignment_rankings_by_assignment("Homework 1 (1001)", False)
+
+    assert rankings.columns == ["Name", "ID", "Grade", "Status", "Section"]
+    assert rankings.select("Name", "ID", "Section", "Grade").rows() == [
+        ("Alex Lee", "1001", "COURSE 101-500", 9.0),
+        ("Sam Garcia", "1002", "COURSE 101-500", 7.0),
+        ("Alex Lee", "1003", "COURSE 101-501", 4.0),
+        ("Riley Kim", "1004", "COURSE 101-501", None),
+    ]
+
+    exam = analyzer.get_assignment_rankings_by_assignment("Exam 1 (1002)", False)
+    assert exam.select("ID", "Section", "Grade").rows() == [
+        ("1002", "COURSE 101-500", 90.0),
+        ("1003", "COURSE 101-501", 80.0),
+        ("1004", "COURSE 101-501", 70.0),
+        ("1001", "COURSE 101-500", 55.0),
+    ]
+
+def test_duplicate_names_get_different_pseudonyms(gradebook):
+    analyzer = make_analyzer(gradebook(ASSIGNMENTS, STUDENTS))
+
+    labels = analyzer.get_student_labels(True)
+    assert labels["1001"] != labels["1003"]
+    assert len(set(labels.values())) == len(STUDENTS)
+
+    # The anonymized rankings show the pseudonyms in the same order as the named ones
+    anonymized = analyzer.get_assignment_rankings_by_assignment("Homework 1 (1001)", True)
+    assert anonymized.columns == ["Name", "Grade", "Status"]
+    assert anonymized["Name"].to_list() == [labels["1001"], labels["1002"], labels["1003"], labels["1004"]]
+    assert "Alex Lee" not in anonymized["Name"].to_list()
+
+def test_large_course_with_many_duplicate_names(tmp_path):
+    # The synthetic gradebook draws names from small pools, so most of its 5,000 students share a name
+    path = tmp_path / "large.csv"
+    generate_gradebook(path, students=5000, assignments=8, sections=10)
+    grade_parser = GradeParser(path)
+    analyzer = make_analyzer(grade_parser)
+
+    grade_matrix = grade_parser.get_grade_matrix()
+    assert grade_matrix["Name"].n_unique() < grade_matrix.height
+
+    for assignment in grade_parser.get_raw_assignment_titles():
+        rankings = analyzer.get_assignment_rankings_by_assignment(assignment, False)
+
+        # Every row still matches its student's name, section and grade in the grade matrix
+        expected = grade_matrix.select("ID", "Name", "Section", pl.col(assignment).alias("Grade"))
+        joined = rankings.join(expected, on="ID", how="left", suffix=" Expected")
+        assert joined.height == grade_matrix.height
+        assert (joined["Name"] == joined["Name Expected"]).all()
+        assert (joined["Section"] == joined["Section Expected"]).all()
+        assert joined["Grade"].equals(joined["Grade Expected"], null_equal=True)
+
+        # Graded students come first, from highest to lowest
+        graded = rankings["Grade"].drop_nulls()
+        assert rankings["Grade"].head(graded.len()).null_count() == 0
+        assert graded.to_list() == sorted(graded.to_list(), reverse=True)
@@ -0,0 +1,54 @@
+import threading
+
+from grade_parser import SNAPSHOT_GRADES_FILE, GradeParser, is_snapshot
+
+ASSIGNMENTS = [("Homework 1 (1001)", 10.0), ("Quiz 1 (1002)", 20.0)]
+STUDENTS = [
+    ("Lee, Alex", "1001", "COURSE 101-500", [9, "EX"]),
+    ("Garcia, Sam", "1002", "COURSE 101-500", ["", 18]),
+    ("Kim, Riley", "1003", "COURSE 101-501", [7.5, "incomplete"]),
+]
+
+def test_snapshot_round_trip(gradebook, tmp_path):
+    grade_parser = gradebook(ASSIGNMENTS, STUDENTS)
+    snapshot_path = tmp_path / "snapshots" / "abc"
+    grade_parser.save_snapshot(snapshot_path)
+
+    assert is_snapshot(snapshot_path)
+    loaded = GradeParser.from_snapshot(snapshot_path)
+
+    assert loaded.get_grade_matrix().equals(grade_parser.get_grade_matrix())
+    assert loaded.get_status_matrix().equals(grade_parser.get_status_matrix())
+    assert loaded.get_column_metadata().equals(grade_parser.get_column_metadata())
+    assert loaded.get_raw_assignment_titles() == grade_parser.get_raw_assignment_titles()
+    assert loaded.get_assignment_max_points() == [10.0, 20.0]
+
+    # Only the finished snapshot is left in the folder, no temporary files
+    assert [path.name for path in snapshot_path.parent.iterdir()] == ["abc"]
+
+def test_concurrent_saves_leave_one_complete_snapshot(gradebook, tmp_path):
+    grade_parser = gradebook(ASSIGNMENTS, STUDENTS)
+    snapshot_path = tmp_path / "snapshots" / "abc"
+
+    threads = [threading.Thread(target=grade_parser.save_snapshot, args=(snapshot_path,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [path.name for path in snapshot_path.parent.iterdir()] == ["abc"]
+    assert GradeParser.from_snapshot(snapshot_path).get_grade_matrix().equals(grade_parser.get_grade_matrix())
+
+def test_incomplete_snapshot_is_replaced(gradebook, tmp_path):
+    grade_parser = gradebook(ASSIGNMENTS, STUDENTS)
+    snapshot_path = tmp_path / "snapshots" / "abc"
+
+    # A folder holding only some of the files, as an interrupted save used to leave behind
+    snapshot_path.mkdir(parents=True)
+    grade_parser.get_grade_matrix().write_ipc(snapshot_path / SNAPSHOT_GRADES_FILE)
+    assert not is_snapshot(snapshot_path)
+
+    grade_parser.save_snapshot(snapshot_path)
+
+    assert is_snapshot(snapshot_path)
+    assert GradeParser.from_snapshot(snapshot_path).get_status_matrix().equals(grade_parser.get_status_matrix())
@@ -0,0 +1,33 @@
+from conftest import make_analyzer
+
+ASSIGNMENTS = [("Homework 1 (1001)", 10.0), ("Exam 1 (1002)", 100.0)]
+STUDENTS = [
+    ("Lee, Alex", "1001", "COURSE 101-500", [9, 60]),
+    ("Garcia, Sam", "1002", "COURSE 101-500", [7, "EX"]),
+    ("Kim, Riley", "1003", "COURSE 101-501", [9, 80]),
+    ("Patel, Quinn", "1004", "COURSE 101-501", [4, 40]),
+]
+
+def test_student_report(gradebook):
+    analyzer = make_analyzer(gradebook(ASSIGNMENTS, STUDENTS))
+
+    report = analyzer.get_student_report("1001")
+    assert report.columns == ["Assignment", "Grade", "Status", "Max Points", "Percentage", "Rank", "Graded", "Percentile", "Section Mean (%)", "Course Mean (%)"]
+
+    # Tied grades share the best rank, and the percentile counts the graded students at or below the grade
+    homework, exam = report.iter_rows(named=True)
+    assert (homework["Grade"], homework["Percentage"], homework["Rank"], homework["Percentile"]) == (9.0, 90.0, 1, 100.0)
+    assert homework["Section Mean (%)"] == 80.0
+    assert (exam["Rank"], exam["Graded"], exam["Course Mean (%)"]) == (2, 3, 60.0)
+
+    excused = analyzer.get_student_report("1002").row(1, named=True)
+    assert (excused["Grade"], excused["Status"], excused["Rank"]) == (None, "EX", None)
+
+def test_no_assignments(gradebook):
+    analyzer = make_analyzer(gradebook([], [student[:3] + ([],) for student in STUDENTS]))
+
+    # The background precompute starts with the student ranks
+    analyzer.precompute()
+
+    assert analyzer.get_student_report("1001").height == 0
+    assert analyzer.get_precompute_progress() == (0, 0)